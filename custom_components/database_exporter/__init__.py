@@ -2,13 +2,22 @@
 
 from __future__ import annotations
 
-from homeassistant.config_entries import ConfigEntry
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.typing import ConfigType
 
-from .const import CONF_DB_URL
+from .const import (
+    CONF_DB_URL,
+    CONF_DEDUPLICATE_CONTENT,
+    CONF_DOWNSAMPLE,
+    CONF_EXPORT_ROLLUPS,
+    CONF_MAX_ROWS_PER_SECOND,
+    DATA_RECORDER_READER,
+    DOMAIN,
+)
 from .core import DatabaseExportManager
+from .reader import RecorderReader
 from .services import async_setup_services
 
 _PLATFORMS: list[Platform] = []
@@ -19,6 +28,7 @@ type DatabaseExporterConfigEntry = ConfigEntry[DatabaseExportManager]
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up is called when Home Assistant is loading our component."""
 
+    hass.data[DATA_RECORDER_READER] = RecorderReader(hass)
     async_setup_services(hass)
 
     return True
@@ -28,17 +38,60 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: DatabaseExporterConfigEntry
 ) -> bool:
     """Set up Database Exporter from a config entry."""
-    export_manager = DatabaseExportManager(hass, entry.data[CONF_DB_URL])
+    export_manager = DatabaseExportManager(
+        hass,
+        hass.data[DATA_RECORDER_READER],
+        entry.data[CONF_DB_URL],
+        export_rollups=entry.options.get(CONF_EXPORT_ROLLUPS, False),
+        deduplicate_content=entry.options.get(CONF_DEDUPLICATE_CONTENT, False),
+        downsample=entry.options.get(CONF_DOWNSAMPLE, {}),
+        max_rows_per_second=entry.options.get(CONF_MAX_ROWS_PER_SECOND, 0),
+    )
     await export_manager.async_setup()
     entry.runtime_data = export_manager
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     await hass.config_entries.async_forward_entry_setups(entry, _PLATFORMS)
     return True
 
 
+async def _async_update_listener(
+    hass: HomeAssistant, entry: DatabaseExporterConfigEntry
+) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_migrate_entry(
+    hass: HomeAssistant, entry: DatabaseExporterConfigEntry
+) -> bool:
+    """Migrate an old config entry."""
+    if entry.version > 1:
+        return False
+
+    if entry.minor_version < 2:
+        # tuning knobs moved from data to options
+        data = {CONF_DB_URL: entry.data[CONF_DB_URL]}
+        options = {
+            key: value for key, value in entry.data.items() if key != CONF_DB_URL
+        }
+        hass.config_entries.async_update_entry(
+            entry, data=data, options={**options, **entry.options}, minor_version=2
+        )
+
+    return True
+
+
 async def async_unload_entry(
     hass: HomeAssistant, entry: DatabaseExporterConfigEntry
 ) -> bool:
     """Teardown a Database Exporter config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, _PLATFORMS):
         await entry.runtime_data.async_teardown()
+        if not any(
+            other.state is ConfigEntryState.LOADED
+            for other in hass.config_entries.async_entries(DOMAIN)
+            if other.entry_id != entry.entry_id
+        ):
+            # nothing else is exporting, so cached pages would only go stale
+            hass.data[DATA_RECORDER_READER].clear()
     return unload_ok
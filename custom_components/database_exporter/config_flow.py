@@ -7,12 +7,26 @@ from typing import Any
 
 import voluptuous as vol
 
-from homeassistant.config_entries import ConfigFlow, ConfigFlowResult
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import (
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
-
-from .const import CONF_DB_URL, DOMAIN
+from homeassistant.helpers.selector import ObjectSelector
+
+from .const import (
+    CONF_DB_URL,
+    CONF_DEDUPLICATE_CONTENT,
+    CONF_DOWNSAMPLE,
+    CONF_EXPORT_ROLLUPS,
+    CONF_MAX_ROWS_PER_SECOND,
+    DOMAIN,
+)
 from .core import init_connection
+from .downsample import DOWNSAMPLE_SCHEMA
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -22,6 +36,17 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     }
 )
 
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_EXPORT_ROLLUPS, default=False): bool,
+        vol.Optional(CONF_DEDUPLICATE_CONTENT, default=False): bool,
+        vol.Optional(CONF_DOWNSAMPLE, default={}): ObjectSelector(),
+        vol.Optional(CONF_MAX_ROWS_PER_SECOND, default=0): vol.All(
+            vol.Coerce(int), vol.Range(min=0)
+        ),
+    }
+)
+
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect.
@@ -41,10 +66,25 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     return {"title": "Name of the device", CONF_DB_URL: db_url}
 
 
+def validate_options(data: dict[str, Any]) -> None:
+    """Validate the options that can't be checked by OPTIONS_SCHEMA alone."""
+    try:
+        DOWNSAMPLE_SCHEMA(data.get(CONF_DOWNSAMPLE, {}))
+    except vol.Invalid as e:
+        raise InvalidDownsample from e
+
+
 class ConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Database Exporter."""
 
     VERSION = 1
+    MINOR_VERSION = 2
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -67,5 +107,34 @@ class ConfigFlow(ConfigFlow, domain=DOMAIN):
         )
 
 
+class OptionsFlowHandler(OptionsFlow):
+    """Handle tuning options for Database Exporter."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                validate_options(user_input)
+            except InvalidDownsample:
+                errors[CONF_DOWNSAMPLE] = "invalid_downsample"
+            else:
+                return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_SCHEMA, self.config_entry.options
+            ),
+            errors=errors,
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
+
+
+class InvalidDownsample(HomeAssistantError):
+    """Error to indicate the downsampling rules are invalid."""
@@ -1,7 +1,25 @@
 """Constants for the Database Exporter integration."""
 
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.util.hass_dict import HassKey
+
+if TYPE_CHECKING:
+    from .reader import RecorderReader
+
 DOMAIN = "database_exporter"
 
+DATA_RECORDER_READER: HassKey[RecorderReader] = HassKey(f"{DOMAIN}_recorder_reader")
+
 CONF_DB_URL = "db_url"
+CONF_DEDUPLICATE_CONTENT = "deduplicate_content"
+CONF_DOWNSAMPLE = "downsample"
+CONF_EXPORT_ROLLUPS = "export_rollups"
+CONF_MAX_ROWS_PER_SECOND = "max_rows_per_second"
 
 SERVICE_EXPORT = "export"
+SERVICE_VERIFY = "verify"
+
+ATTR_TIME_BUDGET = "time_budget"
@@ -0,0 +1,42 @@
+"""Content addressing for the Database Exporter integration."""
+
+from collections import OrderedDict
+from collections.abc import Iterable
+import hashlib
+
+CONTENT_HASH_SIZE = 16
+MAX_CACHED_HASHES = 100_000
+
+
+def content_hash(blob: str) -> str:
+    """Return the hex content hash of a recorder JSON blob."""
+    return hashlib.blake2b(blob.encode(), digest_size=CONTENT_HASH_SIZE).hexdigest()
+
+
+class ContentCache:
+    """Recently used content hashes known to be stored in the target.
+
+    Blobs whose hash is cached are neither decoded nor sent again. Hashes
+    must only be added once the content has been committed, so that a failed
+    batch can't leave the cache claiming content the target doesn't have.
+    """
+
+    def __init__(self, max_size: int = MAX_CACHED_HASHES) -> None:
+        """Initialize the cache."""
+        self.max_size = max_size
+        self._hashes: OrderedDict[str, None] = OrderedDict()
+
+    def __contains__(self, content_hash: object) -> bool:
+        """Return whether the content is known to be stored."""
+        if content_hash not in self._hashes:
+            return False
+        self._hashes.move_to_end(content_hash)
+        return True
+
+    def add_all(self, content_hashes: Iterable[str]) -> None:
+        """Record content as stored, evicting the least recently used hashes."""
+        for content_hash in content_hashes:
+            self._hashes[content_hash] = None
+            self._hashes.move_to_end(content_hash)
+        while len(self._hashes) > self.max_size:
+            self._hashes.popitem(last=False)
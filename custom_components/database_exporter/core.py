@@ -1,5 +1,7 @@
 """Core module for the Home Assistant database export manager."""
 
+import asyncio
+import contextlib
 from datetime import datetime
 import logging
 import sqlite3
@@ -14,10 +16,29 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.event import CALLBACK_TYPE, async_track_point_in_time
 from homeassistant.util import dt as dt_util
 
-from .db_schema import Base
-from .exporters import EventExporter, Exporter, StateExporter
+from .content import ContentCache
+from .downsample import DOWNSAMPLE_SCHEMA, Downsampler
+from .exporters import (
+    EventExporter,
+    Exporter,
+    ShortTermStatisticsExporter,
+    StateExporter,
+    StatisticsExporter,
+)
+from .migration import migrate_schema
 from .models import DatabaseExporterError, DatabaseExportManagerError
+from .parquet import (
+    ParquetExportTarget,
+    check_parquet_target,
+    is_parquet_url,
+    open_parquet_target,
+)
+from .reader import RecorderReader
+from .throttle import ExportThrottle
+from .transform import json_serializer
 from .types import ScopedSession
+from .util import async_run_to_completion
+from .verify import RangeVerifier, VerifyResult
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,53 +46,204 @@ _LOGGER = logging.getLogger(__name__)
 class DatabaseExportManager:
     """The database export manager."""
 
-    def __init__(self, hass: HomeAssistant, db_url: str) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        reader: RecorderReader,
+        db_url: str,
+        *,
+        export_rollups: bool = False,
+        deduplicate_content: bool = False,
+        downsample: dict[str, Any] | None = None,
+        max_rows_per_second: int = 0,
+    ) -> None:
         """Initialize the export manager."""
         self.hass = hass
+        self.reader = reader
         self.db_url = db_url
+        self.export_rollups = export_rollups
+        self.deduplicate_content = deduplicate_content
+        self.downsample = DOWNSAMPLE_SCHEMA(downsample or {})
+        self.throttle = ExportThrottle(hass, max_rows_per_second)
         self.session: ScopedSession | None = None
+        self.file_target: ParquetExportTarget | None = None
         self.exporters: list[Exporter] = []
+        self.verifiers: list[RangeVerifier] = []
         self.cron_event: CronSim | None = None
         self.remove_next_export_event: CALLBACK_TYPE | None = None
         self.next_export: datetime | None = None
+        self.export_task: asyncio.Task[None] | None = None
+        self.export_queued = False
+        self.write_lock = asyncio.Lock()
+        self.active = False
 
     async def async_setup(self) -> None:
-        """Set up the database export manager."""
+        """Set up the database export manager.
+
+        Connecting to the target is deferred until the first export, so that
+        a slow or remote target doesn't hold up Home Assistant startup.
+        """
         db_url = self.db_url
 
-        if self.session:
+        if self.active:
             _LOGGER.debug("Resetting Database Export Manager with URL: %s", db_url)
             await self.async_teardown()
 
         _LOGGER.debug("Setting up Database Export Manager with URL: %s", db_url)
-        self.session = await self.hass.async_add_executor_job(_init_session, db_url)
+        self.active = True
+        self._schedule_next()
+
+    async def _async_connect(self) -> None:
+        """Connect to the target and create the exporters, if not done yet."""
+        if self.exporters:
+            return
+
+        db_url = self.db_url
+        _LOGGER.debug("Connecting to export target with URL: %s", db_url)
+        hass, reader = self.hass, self.reader
+        rollups = self.export_rollups
+        downsample = self.downsample
+        if is_parquet_url(db_url):
+            self.file_target = await hass.async_add_executor_job(
+                open_parquet_target, hass.config.path, db_url
+            )
+            if rollups:
+                _LOGGER.warning("Rollups are not supported for Parquet targets")
+                rollups = False
+            if downsample:
+                _LOGGER.warning("Downsampling is not supported for Parquet targets")
+                downsample = {}
+        else:
+            self.session = await hass.async_add_executor_job(_init_session, db_url)
+
+        session = self.session
+        options: dict[str, Any] = {
+            "file_target": self.file_target,
+            # Parquet segments are compressed, which already deduplicates well
+            "content_cache": (
+                ContentCache() if session and self.deduplicate_content else None
+            ),
+        }
+        downsampler = Downsampler(downsample) if downsample else None
         self.exporters = [
-            EventExporter(self.session, self.hass),
-            StateExporter(self.session, self.hass),
+            EventExporter(session, hass, reader, **options),
+            StateExporter(
+                session,
+                hass,
+                reader,
+                **options,
+                rollups=rollups,
+                downsampler=downsampler,
+            ),
+            StatisticsExporter(session, hass, reader, **options),
+            ShortTermStatisticsExporter(session, hass, reader, **options),
         ]
-        self._schedule_next()
+        if session:
+            # downsampled states are missing from the target on purpose
+            self.verifiers = [
+                RangeVerifier(exporter, exporter._checksum_columns())  # noqa: SLF001
+                for exporter in self.exporters
+                if not (isinstance(exporter, StateExporter) and exporter.downsampler)
+            ]
 
     async def async_teardown(self) -> None:
         """Tear down the database export manager."""
         _LOGGER.debug("Tearing down Database Export Manager with URL: %s", self.db_url)
-        self.exporters.clear()
-        if self.session:
-            await self.hass.async_add_executor_job(self.session.remove)
+        self.active = False
+        if task := self.export_task:
+            # let the export stop before releasing what it is using
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, DatabaseExporterError):
+                await task
+        # a verification slice is bounded by its time budget, so let it finish
+        async with self.write_lock:
+            self.exporters.clear()
+            self.verifiers.clear()
+            if self.session:
+                await self.hass.async_add_executor_job(self.session.remove)
+            self.session = None
+            self.file_target = None
         self._unschedule_next()
 
-    async def async_export_data(self) -> None:
-        """Export data from the database."""
-        if not self.session:
-            raise DatabaseExportManagerError("Session is not initialized")
+    async def async_export_data(self) -> bool:
+        """Export data from the database.
+
+        Only one export runs at a time. A call that arrives while an export is
+        running joins it and queues a single follow-up run, so that rows
+        recorded after the running export started are still picked up.
+        Returns whether this call started a new run.
+        """
+        if not self.active:
+            raise DatabaseExportManagerError("Export manager is not set up")
+
+        if (task := self.export_task) is not None:
+            _LOGGER.debug("Joining export already running for %s", self.db_url)
+            self.export_queued = True
+            await asyncio.shield(task)
+            return False
+
+        task = self.hass.async_create_task(
+            self._async_run_exports(), f"database_exporter export to {self.db_url}"
+        )
+        self.export_task = task
+        await asyncio.shield(task)
+        return True
 
+    async def _async_run_exports(self) -> None:
+        try:
+            while True:
+                self.export_queued = False
+                await self._async_export()
+                if not self.export_queued:
+                    break
+                _LOGGER.debug("Running queued export for %s", self.db_url)
+        finally:
+            self.export_task = None
+
+    async def _async_export(self) -> None:
         _LOGGER.info("Exporting data to %s", self.db_url)
+        file_target = self.file_target
         try:
-            for exporter in self.exporters:
-                await exporter.async_export_all()
-        except SQLAlchemyError as error:
+            async with self.write_lock:
+                await self._async_connect()
+                for exporter in self.exporters:
+                    await exporter.async_export_all(self.throttle)
+                if file_target:
+                    await async_run_to_completion(self.hass, file_target.flush)
+        except (SQLAlchemyError, OSError) as error:
             raise DatabaseExportManagerError("Export failed") from error
+        finally:
+            if file_target:
+                file_target.discard()  # drop rows left unflushed by a failure
         _LOGGER.info("Finished exporting data to %s", self.db_url)
 
+    async def async_verify_data(self, time_budget: float) -> dict[str, VerifyResult]:
+        """Verify exported data against the recorder and repair any gaps.
+
+        Each exporter gets an equal share of the time budget, and picks up
+        where its previous verification stopped.
+        """
+        if not self.active:
+            raise DatabaseExportManagerError("Export manager is not set up")
+
+        results: dict[str, VerifyResult] = {}
+        _LOGGER.info("Verifying data exported to %s", self.db_url)
+        try:
+            async with self.write_lock:
+                if not self.active:  # torn down while waiting for the lock
+                    raise DatabaseExportManagerError("Export manager is not set up")
+                await self._async_connect()
+                if not self.verifiers:
+                    raise DatabaseExportManagerError("Verification is not supported")
+                budget = time_budget / len(self.verifiers)
+                for verifier in self.verifiers:
+                    name = verifier.columns.target_id.class_.__tablename__
+                    results[name] = await verifier.async_verify(self.throttle, budget)
+        except SQLAlchemyError as error:
+            raise DatabaseExportManagerError("Verification failed") from error
+        _LOGGER.info("Finished verifying data exported to %s", self.db_url)
+        return results
+
     @callback
     def _schedule_next(self) -> None:
         self._unschedule_next()
@@ -108,14 +280,30 @@ class DatabaseExportManager:
 
 async def init_connection(hass: HomeAssistant, db_url: str) -> bool:
     """Test the database connection."""
+    if is_parquet_url(db_url):
+        await hass.async_add_executor_job(
+            check_parquet_target, hass.config.path, db_url
+        )
+        return True
+
     try:
-        await hass.async_add_executor_job(_init_session, db_url)
+        await hass.async_add_executor_job(_test_connection, db_url)
     except SQLAlchemyError as error:
         raise DatabaseExportManagerError("Connection init failed") from error
     else:
         return True
 
 
+def _test_connection(db_url: str) -> None:
+    _LOGGER.debug("Testing connection for URL: %s", db_url)
+    engine = sqlalchemy.create_engine(db_url)
+    try:
+        with engine.connect() as conn:
+            conn.execute(sqlalchemy.text("SELECT 1;"))
+    finally:
+        engine.dispose()
+
+
 def _init_session(db_url: str) -> ScopedSession:
     _LOGGER.debug("Initializing session for URL: %s", db_url)
 
@@ -127,20 +315,17 @@ def _init_session(db_url: str) -> ScopedSession:
         match backend:
             case "sqlite":
                 _LOGGER.debug("Detected SQLite backend")
-                engine = sqlalchemy.create_engine(url)
+                engine = sqlalchemy.create_engine(url, json_serializer=json_serializer)
                 sqlalchemy.event.listen(engine, "connect", _set_sqlite_pragmas)
 
             case _:
                 _LOGGER.debug("Detected other backend: %s", backend)
-                engine = sqlalchemy.create_engine(url)
+                engine = sqlalchemy.create_engine(url, json_serializer=json_serializer)
 
-        _LOGGER.debug("Creating tables")
-        Base.metadata.create_all(engine)
+        migrate_schema(engine)
 
         _LOGGER.debug("Creating session factory")
         session = scoped_session(sessionmaker(bind=engine, future=True))
-        with session.begin():
-            session.execute(sqlalchemy.text("SELECT 1;"))
 
         _LOGGER.debug("Session initialized successfully")
     except SQLAlchemyError as error:
@@ -1,16 +1,29 @@
 """Database schema for the database exporter component."""
 
+from typing import Any
+
 from sqlalchemy import (
+    DOUBLE,
     JSON,
     BigInteger,
+    Boolean,
+    Column,
+    Connection,
+    Float,
     ForeignKey,
     Identity,
+    Index,
     Integer,
     LargeBinary,
+    MetaData,
     SmallInteger,
     String,
+    event,
 )
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.schema import CreateColumn
+from sqlalchemy.sql.compiler import DDLCompiler, GenericTypeCompiler
 
 from homeassistant.const import (
     MAX_LENGTH_EVENT_EVENT_TYPE,
@@ -18,20 +31,54 @@ from homeassistant.const import (
     MAX_LENGTH_STATE_STATE,
 )
 
+from .content import CONTENT_HASH_SIZE
+
+SCHEMA_VERSION = 7
+
+TABLE_EXPORTED_CONTENT = "exported_content"
 TABLE_EXPORTED_EVENTS = "exported_events"
 TABLE_EXPORTED_EVENTS_DATA = "exported_events_data"
 TABLE_EXPORTED_STATES = "exported_states"
 TABLE_EXPORTED_STATES_ATTRIBUTES = "exported_states_attributes"
+TABLE_EXPORTED_STATES_HOURLY = "exported_states_hourly"
+TABLE_EXPORTED_STATISTICS = "exported_statistics"
+TABLE_EXPORTED_STATISTICS_META = "exported_statistics_meta"
+TABLE_EXPORTED_STATISTICS_SHORT_TERM = "exported_statistics_short_term"
+TABLE_EXPORTER_SCHEMA_CHANGES = "exporter_schema_changes"
+TABLE_EXPORTER_WATERMARKS = "exporter_watermarks"
 
 ID_TYPE = BigInteger().with_variant(Integer(), "sqlite")
+CONTENT_HASH_TYPE = String(2 * CONTENT_HASH_SIZE)
+# MySQL and MariaDB store FLOAT in single precision
+DOUBLE_TYPE = Float().with_variant(DOUBLE(), "mysql", "mariadb")
 
 
 class Base(DeclarativeBase):
     """Base class for tables."""
 
+    type_annotation_map = {float: DOUBLE_TYPE}
+
+
+class ExportedContent(Base):
+    """Table for exported attributes and event data, stored once by content hash."""
+
+    __tablename__ = TABLE_EXPORTED_CONTENT
+
+    id: Mapped[int] = mapped_column(ID_TYPE, Identity(), primary_key=True)
+
+    # from `EventData` and `StateAttributes` models
+    content_hash: Mapped[str] = mapped_column(
+        CONTENT_HASH_TYPE, index=True, unique=True
+    )
+    value: Mapped[dict] = mapped_column(JSON())
+
 
 class ExportedEventData(Base):
-    """Table for exported events data."""
+    """Table for exported events data.
+
+    When `content_hash` is set, `value` is JSON null and the data is stored
+    in `ExportedContent` instead.
+    """
 
     __tablename__ = TABLE_EXPORTED_EVENTS_DATA
 
@@ -40,6 +87,7 @@ class ExportedEventData(Base):
     # from `EventData` model
     data_id: Mapped[int] = mapped_column(ID_TYPE, index=True, unique=True)
     value: Mapped[dict] = mapped_column(JSON())
+    content_hash: Mapped[str | None] = mapped_column(CONTENT_HASH_TYPE)
 
 
 class ExportedEvents(Base):
@@ -58,15 +106,23 @@ class ExportedEvents(Base):
     context_parent_ulid: Mapped[bytes | None] = mapped_column(LargeBinary(16))
 
     # from `EventTypes` model
-    event_type: Mapped[str] = mapped_column(String(MAX_LENGTH_EVENT_EVENT_TYPE), index=True)
+    event_type: Mapped[str] = mapped_column(
+        String(MAX_LENGTH_EVENT_EVENT_TYPE), index=True
+    )
 
     # from `EventData` model
-    data_id: Mapped[int | None] = mapped_column(ID_TYPE, ForeignKey(f"{TABLE_EXPORTED_EVENTS_DATA}.data_id"))
+    data_id: Mapped[int | None] = mapped_column(
+        ID_TYPE, ForeignKey(f"{TABLE_EXPORTED_EVENTS_DATA}.data_id")
+    )
     data: Mapped[ExportedEventData | None] = relationship()
 
 
 class ExportedStateAttributes(Base):
-    """Table for exported states attributes."""
+    """Table for exported states attributes.
+
+    When `content_hash` is set, `value` is JSON null and the attributes are
+    stored in `ExportedContent` instead.
+    """
 
     __tablename__ = TABLE_EXPORTED_STATES_ATTRIBUTES
 
@@ -75,6 +131,7 @@ class ExportedStateAttributes(Base):
     # from `StateAttributes` model
     attributes_id: Mapped[int] = mapped_column(ID_TYPE, index=True, unique=True)
     value: Mapped[dict] = mapped_column(JSON())
+    content_hash: Mapped[str | None] = mapped_column(CONTENT_HASH_TYPE)
 
 
 class ExportedStates(Base):
@@ -90,17 +147,205 @@ class ExportedStates(Base):
     last_changed: Mapped[float | None]
     last_reported: Mapped[float | None]
     last_updated: Mapped[float] = mapped_column(index=True)
-    old_state_id: Mapped[int | None] = mapped_column(ForeignKey(f"{TABLE_EXPORTED_STATES}.state_id", use_alter=True))
+    old_state_id: Mapped[int | None] = mapped_column(
+        ForeignKey(f"{TABLE_EXPORTED_STATES}.state_id", use_alter=True)
+    )
     origin_id: Mapped[int] = mapped_column(SmallInteger())
     context_ulid: Mapped[bytes | None] = mapped_column(LargeBinary(16))
     context_user_hex: Mapped[bytes | None] = mapped_column(LargeBinary(16))
     context_parent_ulid: Mapped[bytes | None] = mapped_column(LargeBinary(16))
 
     # from `StatesMeta` model
-    entity_id: Mapped[str] = mapped_column(String(MAX_LENGTH_STATE_ENTITY_ID), index=True)
+    entity_id: Mapped[str] = mapped_column(
+        String(MAX_LENGTH_STATE_ENTITY_ID), index=True
+    )
 
     # from `StateAttributes` model
     attributes_id: Mapped[int | None] = mapped_column(
         ID_TYPE, ForeignKey(f"{TABLE_EXPORTED_STATES_ATTRIBUTES}.attributes_id")
     )
     attributes: Mapped[ExportedStateAttributes | None] = relationship()
+
+
+class ExportedStatesHourly(Base):
+    """Table for hourly rollups of exported numeric states."""
+
+    __tablename__ = TABLE_EXPORTED_STATES_HOURLY
+    __table_args__ = (
+        Index(
+            f"ix_{TABLE_EXPORTED_STATES_HOURLY}_entity_id_start_ts",
+            "entity_id",
+            "start_ts",
+            unique=True,
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(ID_TYPE, Identity(), primary_key=True)
+
+    # from `StatesMeta` model
+    entity_id: Mapped[str] = mapped_column(String(MAX_LENGTH_STATE_ENTITY_ID))
+
+    # aggregated from `States` model
+    start_ts: Mapped[float]
+    min: Mapped[float]
+    max: Mapped[float]
+    mean: Mapped[float]
+    sum: Mapped[float]
+    count: Mapped[int] = mapped_column(Integer())
+    last_value: Mapped[float]
+    last_updated: Mapped[float]
+
+
+class ExportedStatisticsMeta(Base):
+    """Table for exported statistics metadata."""
+
+    __tablename__ = TABLE_EXPORTED_STATISTICS_META
+
+    id: Mapped[int] = mapped_column(ID_TYPE, Identity(), primary_key=True)
+
+    # from `StatisticsMeta` model
+    metadata_id: Mapped[int] = mapped_column(ID_TYPE, index=True, unique=True)
+    statistic_id: Mapped[str] = mapped_column(String(255), index=True)
+    source: Mapped[str] = mapped_column(String(32))
+    unit_of_measurement: Mapped[str | None] = mapped_column(String(255))
+    has_mean: Mapped[bool | None] = mapped_column(Boolean())
+    mean_type: Mapped[int | None] = mapped_column(SmallInteger())
+    has_sum: Mapped[bool | None] = mapped_column(Boolean())
+    name: Mapped[str | None] = mapped_column(String(255))
+
+
+class ExportedStatistics(Base):
+    """Table for exported long-term statistics."""
+
+    __tablename__ = TABLE_EXPORTED_STATISTICS
+    __table_args__ = (
+        Index(
+            f"ix_{TABLE_EXPORTED_STATISTICS}_metadata_id_start_ts",
+            "metadata_id",
+            "start_ts",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(ID_TYPE, Identity(), primary_key=True)
+
+    # from `Statistics` model
+    statistics_id: Mapped[int] = mapped_column(ID_TYPE, index=True, unique=True)
+    created_ts: Mapped[float | None]
+    start_ts: Mapped[float | None] = mapped_column(index=True)
+    mean: Mapped[float | None]
+    min: Mapped[float | None]
+    max: Mapped[float | None]
+    last_reset_ts: Mapped[float | None]
+    state: Mapped[float | None]
+    sum: Mapped[float | None]
+
+    # from `StatisticsMeta` model
+    metadata_id: Mapped[int | None] = mapped_column(
+        ID_TYPE, ForeignKey(f"{TABLE_EXPORTED_STATISTICS_META}.metadata_id")
+    )
+    meta: Mapped[ExportedStatisticsMeta | None] = relationship()
+
+
+class ExportedStatisticsShortTerm(Base):
+    """Table for exported short-term statistics."""
+
+    __tablename__ = TABLE_EXPORTED_STATISTICS_SHORT_TERM
+    __table_args__ = (
+        Index(
+            f"ix_{TABLE_EXPORTED_STATISTICS_SHORT_TERM}_metadata_id_start_ts",
+            "metadata_id",
+            "start_ts",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(ID_TYPE, Identity(), primary_key=True)
+
+    # from `StatisticsShortTerm` model
+    statistics_id: Mapped[int] = mapped_column(ID_TYPE, index=True, unique=True)
+    created_ts: Mapped[float | None]
+    start_ts: Mapped[float | None] = mapped_column(index=True)
+    mean: Mapped[float | None]
+    min: Mapped[float | None]
+    max: Mapped[float | None]
+    last_reset_ts: Mapped[float | None]
+    state: Mapped[float | None]
+    sum: Mapped[float | None]
+
+    # from `StatisticsMeta` model
+    metadata_id: Mapped[int | None] = mapped_column(
+        ID_TYPE, ForeignKey(f"{TABLE_EXPORTED_STATISTICS_META}.metadata_id")
+    )
+    meta: Mapped[ExportedStatisticsMeta | None] = relationship()
+
+
+class ExporterSchemaChanges(Base):
+    """Table for the exporter schema version history."""
+
+    __tablename__ = TABLE_EXPORTER_SCHEMA_CHANGES
+
+    id: Mapped[int] = mapped_column(ID_TYPE, Identity(), primary_key=True)
+    schema_version: Mapped[int] = mapped_column(Integer())
+    changed_ts: Mapped[float]
+
+
+class ExporterWatermarks(Base):
+    """Table for the latest recorder ID read by exporters that drop rows."""
+
+    __tablename__ = TABLE_EXPORTER_WATERMARKS
+
+    id: Mapped[int] = mapped_column(ID_TYPE, Identity(), primary_key=True)
+    table_name: Mapped[str] = mapped_column(String(64), index=True, unique=True)
+    last_id: Mapped[int] = mapped_column(ID_TYPE)
+
+
+# DuckDB speaks the PostgreSQL dialect, but has no identity columns, treats FLOAT
+# as single precision, and can't add foreign keys after a table is created. It
+# also can't update indexed columns on conflict, so only unique indexes, which
+# upserts conflict on, are created.
+
+
+def _identity_sequence_name(column: Column[Any]) -> str:
+    return f"{column.table.name}_{column.name}_seq"
+
+
+@compiles(CreateColumn, "duckdb")
+def _visit_create_column_duckdb(
+    element: CreateColumn, compiler: DDLCompiler, **kw: Any
+) -> str:
+    column = element.element
+    if column.identity is None:
+        return compiler.visit_create_column(element, **kw)
+    name = compiler.preparer.format_column(column)
+    type_ = compiler.type_compiler.process(column.type, type_expression=column)
+    sequence = _identity_sequence_name(column)
+    return f"{name} {type_} DEFAULT nextval('{sequence}') NOT NULL"
+
+
+@compiles(Float, "duckdb")
+def _visit_float_duckdb(type_: Float, compiler: GenericTypeCompiler, **kw: Any) -> str:
+    return "DOUBLE"
+
+
+@event.listens_for(Base.metadata, "before_create")
+def _create_identity_sequences_duckdb(
+    target: MetaData, connection: Connection, **kw: Any
+) -> None:
+    if connection.dialect.name != "duckdb":
+        return
+    for table in kw.get("tables") or target.sorted_tables:
+        for column in table.columns:
+            if column.identity is not None:
+                sequence = _identity_sequence_name(column)
+                connection.exec_driver_sql(f"CREATE SEQUENCE IF NOT EXISTS {sequence}")
+
+
+def _not_duckdb(*args: Any, dialect: Any, **kw: Any) -> bool:
+    return dialect.name != "duckdb"
+
+
+for _table in Base.metadata.tables.values():
+    for _constraint in _table.foreign_key_constraints:
+        _constraint.ddl_if(callable_=_not_duckdb)
+    for _index in _table.indexes:
+        if not _index.unique:
+            _index.ddl_if(callable_=_not_duckdb)
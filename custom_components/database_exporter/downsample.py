@@ -0,0 +1,159 @@
+"""State downsampling for the Database Exporter integration."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+import logging
+import math
+from typing import TYPE_CHECKING, Any
+
+import voluptuous as vol
+
+from homeassistant.core import split_entity_id
+
+if TYPE_CHECKING:
+    from homeassistant.components.recorder.db_schema import States
+
+_LOGGER = logging.getLogger(__name__)
+
+CONF_DEADBAND = "deadband"
+CONF_RELATIVE_DEADBAND = "relative_deadband"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_HEARTBEAT = "heartbeat"
+
+_NON_NEGATIVE = vol.All(vol.Coerce(float), vol.Range(min=0))
+
+DOWNSAMPLE_RULE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_DEADBAND, default=0): _NON_NEGATIVE,
+        vol.Optional(CONF_RELATIVE_DEADBAND, default=0): _NON_NEGATIVE,
+        vol.Optional(CONF_MIN_INTERVAL, default=0): _NON_NEGATIVE,
+        vol.Optional(CONF_HEARTBEAT, default=0): _NON_NEGATIVE,
+    }
+)
+
+# rules are keyed by entity ID or by domain
+DOWNSAMPLE_SCHEMA = vol.Schema({vol.Coerce(str): DOWNSAMPLE_RULE_SCHEMA})
+
+
+@dataclass(frozen=True, slots=True)
+class DownsampleRule:
+    """When to export a state of a downsampled entity.
+
+    A state is exported if the entity has no exported state yet, if
+    `heartbeat` seconds have passed since the last exported one, or if its
+    value moved by more than the deadband and at least `min_interval`
+    seconds have passed. Non-numeric states count as moved when they
+    change. A zero disables the corresponding check.
+    """
+
+    deadband: float = 0
+    relative_deadband: float = 0
+    min_interval: float = 0
+    heartbeat: float = 0
+
+    def should_export(self, last: tuple[str | None, float], state: States) -> bool:
+        """Return whether to export a state, given the last exported one."""
+        last_state, last_ts = last
+        elapsed = state.last_updated_ts - last_ts
+        if self.heartbeat and elapsed >= self.heartbeat:
+            return True
+        if elapsed < self.min_interval:
+            return False
+        if not (self.deadband or self.relative_deadband):
+            return True
+
+        value, last_value = numeric_state(state.state), numeric_state(last_state)
+        if value is None or last_value is None:
+            return state.state != last_state
+        threshold = max(self.deadband, self.relative_deadband * abs(last_value))
+        return abs(value - last_value) > threshold
+
+
+class Downsampler:
+    """Drop states of noisy entities before they are exported.
+
+    Only the last exported state of each downsampled entity is kept, so
+    rules are evaluated as batches stream through. Decisions for a batch
+    are pending until `commit` is called once the batch has been written.
+    """
+
+    def __init__(self, rules: Mapping[str, Mapping[str, Any]]) -> None:
+        """Initialize the downsampler from validated rule options."""
+        self.rules = {key: DownsampleRule(**rule) for key, rule in rules.items()}
+        self._entity_rules: dict[str, DownsampleRule | None] = {}
+        # entity ID -> (last exported state ID, its state, its last updated timestamp)
+        self.last_exported: dict[str, tuple[int, str | None, float]] | None = None
+        self._pending: dict[str, tuple[int, str | None, float]] = {}
+        self._pending_states: list[States] = []
+
+    def rule_for(self, entity_id: str) -> DownsampleRule | None:
+        """Return the rule for an entity, preferring entity over domain rules."""
+        try:
+            return self._entity_rules[entity_id]
+        except KeyError:
+            rule = self.rules.get(entity_id) or self.rules.get(
+                split_entity_id(entity_id)[0]
+            )
+            self._entity_rules[entity_id] = rule
+            return rule
+
+    def sample(self, states: list[States]) -> list[tuple[States, int | None]]:
+        """Return the states to export, each with the old state ID to export.
+
+        Old state IDs are pointed at the last exported state of the entity,
+        since the recorder's old state may have been dropped.
+        """
+        assert self.last_exported is not None
+        self._pending.clear()
+        self._pending_states = []
+        sampled: list[tuple[States, int | None]] = []
+        for state in states:
+            entity_id = state.states_meta_rel.entity_id
+            if (rule := self.rule_for(entity_id)) is None:
+                sampled.append((state, state.old_state_id))
+                continue
+
+            last = self._pending.get(entity_id) or self.last_exported.get(entity_id)
+            if last is None:
+                old_state_id = state.old_state_id
+            elif rule.should_export(last[1:], state):
+                old_state_id = last[0]
+            else:
+                continue
+
+            self._pending[entity_id] = (
+                state.state_id,
+                state.state,
+                state.last_updated_ts,
+            )
+            sampled.append((state, old_state_id))
+
+        self._pending_states = [state for state, _ in sampled]
+        _LOGGER.debug("Sampled %d of %d states", len(sampled), len(states))
+        return sampled
+
+    def commit(self) -> list[States]:
+        """Record the pending batch as exported, and return its exported states."""
+        assert self.last_exported is not None
+        self.last_exported.update(self._pending)
+        exported = self._pending_states
+        self.discard()
+        return exported
+
+    def discard(self) -> None:
+        """Forget the pending batch."""
+        self._pending.clear()
+        self._pending_states = []
+
+
+def numeric_state(state: str | None) -> float | None:
+    """Return a state as a finite number, or None if it isn't one."""
+    if state is None:
+        return None
+    try:
+        value = float(state)
+    except ValueError:
+        return None
+    return value if math.isfinite(value) else None
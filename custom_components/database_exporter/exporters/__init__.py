@@ -3,5 +3,12 @@
 from .base import Exporter
 from .events import EventExporter
 from .states import StateExporter
+from .statistics import ShortTermStatisticsExporter, StatisticsExporter
 
-__all__ = ["EventExporter", "Exporter", "StateExporter"]
+__all__ = [
+    "EventExporter",
+    "Exporter",
+    "ShortTermStatisticsExporter",
+    "StateExporter",
+    "StatisticsExporter",
+]
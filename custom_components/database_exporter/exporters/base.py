@@ -1,17 +1,29 @@
 """Base Exporter for the database exporter component."""
 
 from abc import ABC, abstractmethod
-from collections.abc import Sequence
+from collections.abc import Callable, Mapping, Sequence
 import logging
-from typing import Generic, TypeVar
+from typing import TYPE_CHECKING, Any, Generic, TypeVar
 
-from sqlalchemy import Insert, ReturnsRows, Select
-from sqlalchemy.orm import Session
+from sqlalchemy import JSON, Insert, ReturnsRows, Select
+from sqlalchemy.orm import InstrumentedAttribute, Session
 
 from homeassistant.components.recorder import get_instance as get_recorder_instance
 from homeassistant.core import HomeAssistant
 
+from ..content import content_hash
+from ..db_schema import ExportedContent, ExportedEventData, ExportedStateAttributes
+from ..transform import JSONText
 from ..types import ScopedSession
+from ..upsert import Upsert, execute_upsert, upsert
+from ..util import async_run_to_completion
+
+if TYPE_CHECKING:
+    from ..content import ContentCache
+    from ..parquet import ParquetExportTarget
+    from ..reader import RecorderReader
+    from ..throttle import ExportThrottle
+    from ..verify import ChecksumColumns
 
 SourceModel = TypeVar("SourceModel")
 
@@ -26,34 +38,50 @@ class Exporter(ABC, Generic[SourceModel]):
         super().__init_subclass__(**kwargs)
         cls._LOGGER = LOGGER
 
-    def __init__(self, export_session: ScopedSession, hass: HomeAssistant) -> None:
-        """Initialize the exporter."""
+    def __init__(
+        self,
+        export_session: ScopedSession | None,
+        hass: HomeAssistant,
+        reader: RecorderReader,
+        *,
+        file_target: ParquetExportTarget | None = None,
+        content_cache: ContentCache | None = None,
+    ) -> None:
+        """Initialize the exporter.
+
+        Entries are written to `export_session`, or to `file_target` if given.
+        JSON data is stored by content hash if `content_cache` is given.
+        """
         self.export_session = export_session
         self.hass = hass
+        self.reader = reader
+        self.file_target = file_target
+        self.content_cache = content_cache
+        self._pending_hashes: set[str] = set()
 
-    async def async_export_all(self) -> None:
-        """Export all entries."""
+    async def async_export_all(self, throttle: ExportThrottle) -> None:
+        """Export all entries, pacing batches with the given throttle."""
         self._LOGGER.debug("Exporting all new batches")
         batch_count = 0
-        while await self.async_export_batch():
+        while entry_count := await self.async_export_batch():
             batch_count += 1
             self._LOGGER.debug("Exported batch %d successfully", batch_count)
+            await throttle.async_wait(entry_count)
         self._LOGGER.info("Exported %d batches successfully", batch_count)
 
     async def async_export_batch(self, limit: int = 1000) -> int:
         """Export the next batch of recorder entries."""
         hass_exec = self.hass.async_add_executor_job
-        rec_exec = get_recorder_instance(self.hass).async_add_executor_job
 
         latest_exported_id = await hass_exec(self._get_latest_exported_id)
         start_id = latest_exported_id if latest_exported_id else 0
         self._LOGGER.debug("Exporting entries starting from ID %s", start_id)
 
-        entries = await rec_exec(self._get_recorder_entries, start_id, limit)
+        entries = await self.reader.async_get_entries(self, start_id, limit)
         entry_count = len(entries)
         self._LOGGER.debug("Found %d new entries", entry_count)
 
-        await hass_exec(self._export_entries, entries)
+        await async_run_to_completion(self.hass, self._export_entries, entries)
         self._LOGGER.info("Exported %d entries successfully", entry_count)
 
         return entry_count
@@ -64,6 +92,8 @@ class Exporter(ABC, Generic[SourceModel]):
 
     def _get_latest_exported_id(self) -> int | None:
         stmt = self._latest_exported_id_query()
+        if self.file_target is not None:
+            return self.file_target.latest_exported_id(stmt)
         try:
             self._log_statement(stmt, self.export_session)
             return self.export_session.scalars(stmt).first()
@@ -88,23 +118,133 @@ class Exporter(ABC, Generic[SourceModel]):
             session.close()
         return results
 
+    @abstractmethod
+    def _entry_id(self, entry: SourceModel) -> int:
+        pass
+
+    @abstractmethod
+    def _checksum_columns(self) -> ChecksumColumns:
+        pass
+
     @abstractmethod
     def _export_entries_queries(
         self, entries: list[SourceModel]
     ) -> list[Insert | None]:
         pass
 
+    def _repair_entries_queries(
+        self, entries: list[SourceModel]
+    ) -> list[Insert | None]:
+        """Build the queries to export entries again after verification.
+
+        By default these are the regular export queries, but exporters that
+        aggregate entries into other tables must leave those out, since the
+        entries were already counted there when they were first exported.
+        """
+        return self._export_entries_queries(entries)
+
     def _export_entries(self, entries: list[SourceModel]) -> None:
-        stmts = self._export_entries_queries(entries)
-        stmts = [stmt for stmt in stmts if stmt is not None]
+        self._write_queries(lambda: self._export_entries_queries(entries))
+
+    def _repair_entries(self, entries: list[SourceModel]) -> None:
+        self._write_queries(lambda: self._repair_entries_queries(entries))
+
+    def _write_queries(self, build: Callable[[], list[Insert | None]]) -> None:
+        if self.file_target is not None:
+            self.file_target.write(build())
+            return
         try:
+            stmts = [stmt for stmt in build() if stmt is not None]
             for stmt in stmts:
                 self._log_statement(stmt, self.export_session)
-                self.export_session.execute(stmt)
+                execute_upsert(self.export_session, stmt)
             self.export_session.commit()
+            if self.content_cache is not None:
+                self.content_cache.add_all(self._pending_hashes)
         finally:
+            self._pending_hashes.clear()
             self.export_session.remove()
 
+    def _export_content_queries(
+        self,
+        model: type[ExportedEventData | ExportedStateAttributes],
+        id_column: InstrumentedAttribute[int],
+        models: Mapping[int, Any],
+        blobs: Sequence[str | None],
+    ) -> list[Upsert | None]:
+        """Build upserts for deduplicated recorder JSON data.
+
+        Without a content cache the data is stored inline. Otherwise each
+        distinct blob is stored once in `ExportedContent` under its hash, only
+        blobs not already known to be stored are sent, and `model` only maps
+        recorder IDs to content hashes.
+        """
+        if not models:
+            return [None]
+
+        cache = self.content_cache
+        if cache is None:
+            values = self._to_json(list(models.values()), blobs)
+            to_insert = [
+                {id_column: row_id, model.value: value}
+                for row_id, value in zip(models, values, strict=True)
+            ]
+            return [
+                upsert(model)
+                .values(to_insert)
+                .on_conflict(id_column)
+                .update(*model.__table__.columns)
+            ]
+
+        hashes = [None if blob is None else content_hash(blob) for blob in blobs]
+        new_content: dict[str, tuple[Any, str]] = {}
+        for source, blob, blob_hash in zip(models.values(), blobs, hashes, strict=True):
+            if blob_hash is not None and blob_hash not in cache:
+                new_content.setdefault(blob_hash, (source, blob))
+        self._pending_hashes.update(new_content)
+
+        content_stmt = None
+        if new_content:
+            sources, new_blobs = zip(*new_content.values(), strict=True)
+            values = self._to_json(sources, new_blobs)
+            content_stmt = (
+                upsert(ExportedContent)
+                .values(
+                    [
+                        {
+                            ExportedContent.content_hash: blob_hash,
+                            ExportedContent.value: value,
+                        }
+                        for blob_hash, value in zip(new_content, values, strict=True)
+                    ]
+                )
+                .on_conflict(ExportedContent.content_hash)
+                .update(ExportedContent.content_hash)  # stored content never changes
+            )
+
+        to_insert = [
+            {
+                id_column: row_id,
+                model.content_hash: blob_hash,
+                model.value: source.to_native() if blob_hash is None else JSON.NULL,
+            }
+            for (row_id, source), blob_hash in zip(models.items(), hashes, strict=True)
+        ]
+        return [
+            content_stmt,
+            upsert(model)
+            .values(to_insert)
+            .on_conflict(id_column)
+            .update(*model.__table__.columns),
+        ]
+
+    def _to_json(self, models: Sequence[Any], blobs: Sequence[str | None]) -> list[Any]:
+        """Return the JSON of recorder data models, ready to bind as is."""
+        return [
+            model.to_native() if blob is None else JSONText(blob)
+            for model, blob in zip(models, blobs, strict=True)
+        ]
+
     def _log_statement(self, stmt: ReturnsRows, session: Session) -> None:
         if self._LOGGER.isEnabledFor(logging.DEBUG):
             compiled = stmt.compile(dialect=session.bind.dialect)
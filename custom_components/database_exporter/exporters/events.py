@@ -10,6 +10,7 @@ from homeassistant.components.recorder.db_schema import Events
 
 from ..db_schema import ExportedEventData, ExportedEvents
 from ..upsert import upsert
+from ..verify import ChecksumColumns
 from .base import Exporter
 
 _LOGGER = logging.getLogger(__name__)
@@ -36,35 +37,38 @@ class EventExporter(Exporter[Events], LOGGER=_LOGGER):
             .limit(limit)
         )
 
+    @override
+    def _entry_id(self, entry: Events) -> int:
+        return entry.event_id
+
+    @override
+    def _checksum_columns(self) -> ChecksumColumns:
+        return ChecksumColumns(
+            Events.event_id,
+            Events.time_fired_ts,
+            ExportedEvents.event_id,
+            ExportedEvents.time_fired_ts,
+        )
+
     @override
     def _export_entries_queries(self, entries: list[Events]) -> list[Insert | None]:
         return [
-            self._export_event_data_query(entries),
+            *self._export_event_data_queries(entries),
             self._export_events_query(entries),
         ]
 
-    def _export_event_data_query(self, events: list[Events]) -> Insert | None:
-        to_insert = [
-            {
-                ExportedEventData.data_id: data_id,
-                ExportedEventData.value: model.to_native(),
-            }
-            for data_id, model in {  # deduplicate data
-                event.data_id: event.event_data_rel
-                for event in events
-                if event.data_id
-                if event.event_data_rel
-            }.items()
-        ]
-
-        if len(to_insert) == 0:
-            return None
-
-        return (
-            upsert(ExportedEventData)
-            .values(to_insert)
-            .on_conflict(ExportedEventData.data_id)
-            .update(*ExportedEventData.__table__.columns)
+    def _export_event_data_queries(self, events: list[Events]) -> list[Insert | None]:
+        models = {  # deduplicate data
+            event.data_id: event.event_data_rel
+            for event in events
+            if event.data_id
+            if event.event_data_rel
+        }
+        return self._export_content_queries(
+            ExportedEventData,
+            ExportedEventData.data_id,
+            models,
+            [model.shared_data for model in models.values()],
         )
 
     def _export_events_query(self, events: list[Events]) -> Insert | None:
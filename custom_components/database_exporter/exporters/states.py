@@ -1,28 +1,214 @@
 """State Exporter for the database exporter component."""
 
+from dataclasses import dataclass
+from itertools import batched
 import logging
 from typing import override
 
-from sqlalchemy import Insert, Select, select
+from sqlalchemy import Insert, Select, bindparam, func, select, update
 from sqlalchemy.orm import selectinload
 
+from homeassistant.components.recorder import get_instance as get_recorder_instance
 from homeassistant.components.recorder.db_schema import States
+from homeassistant.core import HomeAssistant
 
-from ..db_schema import ExportedStateAttributes, ExportedStates
+from ..content import ContentCache
+from ..db_schema import (
+    TABLE_EXPORTED_STATES,
+    ExportedStateAttributes,
+    ExportedStates,
+    ExportedStatesHourly,
+    ExporterWatermarks,
+)
+from ..downsample import Downsampler, numeric_state
+from ..parquet import ParquetExportTarget
+from ..reader import RecorderReader
+from ..throttle import ExportThrottle
+from ..types import ScopedSession
 from ..upsert import upsert
+from ..util import async_run_to_completion
+from ..verify import ChecksumColumns
 from .base import Exporter
 
 _LOGGER = logging.getLogger(__name__)
 
+ROLLUP_PERIOD = 3600
+
 
 class StateExporter(Exporter[States], LOGGER=_LOGGER):
     """Exporter for states."""
 
+    def __init__(
+        self,
+        export_session: ScopedSession | None,
+        hass: HomeAssistant,
+        reader: RecorderReader,
+        *,
+        file_target: ParquetExportTarget | None = None,
+        content_cache: ContentCache | None = None,
+        rollups: bool,
+        downsampler: Downsampler | None = None,
+    ) -> None:
+        """Initialize the exporter."""
+        super().__init__(
+            export_session,
+            hass,
+            reader,
+            file_target=file_target,
+            content_cache=content_cache,
+        )
+        self.rollups = rollups
+        self.downsampler = downsampler
+        # entity ID -> (latest exported state ID, its last reported timestamp)
+        self.latest_states: dict[str, tuple[int, float]] | None = None
+
+    @override
+    async def async_export_all(self, throttle: ExportThrottle) -> None:
+        """Reconcile last reported timestamps, then export all new entries."""
+        if self.export_session is not None:
+            await self.async_reconcile_last_reported()
+        if (downsampler := self.downsampler) and downsampler.last_exported is None:
+            downsampler.last_exported = await self.hass.async_add_executor_job(
+                self._get_last_exported_states
+            )
+        await super().async_export_all(throttle)
+
+    async def async_reconcile_last_reported(self, limit: int = 1000) -> None:
+        """Copy in-place `last_reported_ts` updates over to exported states.
+
+        The recorder only moves `last_reported_ts` on the latest state row of
+        each entity, so only the latest exported state per entity is checked.
+        Rows are looked up by primary key, and only rows reported after the
+        oldest known timestamp in each chunk are returned by the recorder.
+        """
+        hass_exec = self.hass.async_add_executor_job
+        rec_exec = get_recorder_instance(self.hass).async_add_executor_job
+
+        if self.latest_states is None:
+            self.latest_states = await hass_exec(self._get_latest_states)
+
+        entity_ids = {
+            state_id: entity_id
+            for entity_id, (state_id, _) in self.latest_states.items()
+        }
+        updated = 0
+        for chunk in batched(self.latest_states.values(), limit):
+            known = dict(chunk)
+            reported = await rec_exec(
+                self._get_reported_states, list(known), min(known.values())
+            )
+            updates = [
+                (state_id, reported_ts)
+                for state_id, reported_ts in reported
+                if reported_ts > known[state_id]
+            ]
+            if not updates:
+                continue
+            await async_run_to_completion(
+                self.hass, self._update_last_reported, updates
+            )
+            for state_id, reported_ts in updates:
+                self.latest_states[entity_ids[state_id]] = (state_id, reported_ts)
+            updated += len(updates)
+
+        self._LOGGER.debug("Reconciled last reported for %d states", updated)
+
+    def _get_latest_states(self) -> dict[str, tuple[int, float]]:
+        latest_ids = select(func.max(ExportedStates.state_id)).group_by(
+            ExportedStates.entity_id
+        )
+        stmt = select(
+            ExportedStates.entity_id,
+            ExportedStates.state_id,
+            func.coalesce(ExportedStates.last_reported, ExportedStates.last_updated),
+        ).filter(ExportedStates.state_id.in_(latest_ids))
+        try:
+            self._log_statement(stmt, self.export_session)
+            rows = self.export_session.execute(stmt).all()
+            return {
+                entity_id: (state_id, reported_ts)
+                for entity_id, state_id, reported_ts in rows
+            }
+        finally:
+            self.export_session.remove()
+
+    def _get_last_exported_states(self) -> dict[str, tuple[int, str | None, float]]:
+        assert self.downsampler is not None
+        latest_ids = select(func.max(ExportedStates.state_id)).group_by(
+            ExportedStates.entity_id
+        )
+        stmt = select(
+            ExportedStates.entity_id,
+            ExportedStates.state_id,
+            ExportedStates.state_value,
+            ExportedStates.last_updated,
+        ).filter(ExportedStates.state_id.in_(latest_ids))
+        try:
+            self._log_statement(stmt, self.export_session)
+            rows = self.export_session.execute(stmt).all()
+            return {
+                entity_id: (state_id, state, last_updated)
+                for entity_id, state_id, state, last_updated in rows
+                if self.downsampler.rule_for(entity_id) is not None
+            }
+        finally:
+            self.export_session.remove()
+
+    def _get_reported_states(
+        self, state_ids: list[int], reported_after: float
+    ) -> list[tuple[int, float]]:
+        stmt = select(States.state_id, States.last_reported_ts).filter(
+            States.state_id.in_(state_ids),
+            States.last_reported_ts > reported_after,
+        )
+        session = get_recorder_instance(self.hass).get_session()
+        try:
+            self._log_statement(stmt, session)
+            rows = session.execute(stmt).all()
+            return [(row.state_id, row.last_reported_ts) for row in rows]
+        finally:
+            session.close()
+
+    def _update_last_reported(self, updates: list[tuple[int, float]]) -> None:
+        table = ExportedStates.__table__
+        stmt = (
+            update(table)
+            .where(table.c.state_id == bindparam("b_state_id"))
+            .values(last_reported=bindparam("b_last_reported"))
+        )
+        params = [
+            {"b_state_id": state_id, "b_last_reported": reported_ts}
+            for state_id, reported_ts in updates
+        ]
+        try:
+            self._log_statement(stmt, self.export_session)
+            self.export_session.execute(stmt, params)
+            self.export_session.commit()
+        finally:
+            self.export_session.remove()
+
     @override
     def _latest_exported_id_query(self) -> Select[tuple[int]]:
         state_id = ExportedStates.state_id
         return select(state_id).order_by(state_id.desc()).limit(1)
 
+    @override
+    def _get_latest_exported_id(self) -> int | None:
+        latest_id = super()._get_latest_exported_id()
+        if self.downsampler is None:
+            return latest_id
+
+        # states dropped by downsampling are only recorded by the watermark
+        stmt = select(ExporterWatermarks.last_id).filter(
+            ExporterWatermarks.table_name == TABLE_EXPORTED_STATES
+        )
+        try:
+            self._log_statement(stmt, self.export_session)
+            watermark = self.export_session.scalars(stmt).first()
+        finally:
+            self.export_session.remove()
+        return max((i for i in (latest_id, watermark) if i is not None), default=None)
+
     @override
     def _recorder_entries_query(
         self, start_id: float, limit: int
@@ -36,38 +222,84 @@ class StateExporter(Exporter[States], LOGGER=_LOGGER):
             .limit(limit)
         )
 
+    @override
+    def _entry_id(self, entry: States) -> int:
+        return entry.state_id
+
+    @override
+    def _checksum_columns(self) -> ChecksumColumns:
+        return ChecksumColumns(
+            States.state_id,
+            States.last_updated_ts,
+            ExportedStates.state_id,
+            ExportedStates.last_updated,
+        )
+
+    @override
+    def _export_entries(self, entries: list[States]) -> None:
+        if self.downsampler is None:
+            super()._export_entries(entries)
+        else:
+            try:
+                super()._export_entries(entries)
+            except BaseException:
+                self.downsampler.discard()
+                raise
+            entries = self.downsampler.commit()
+
+        if (latest_states := self.latest_states) is None:
+            return
+        for state in entries:
+            entity_id = state.states_meta_rel.entity_id
+            latest = latest_states.get(entity_id)
+            if latest is None or latest[0] < state.state_id:
+                reported_ts = state.last_reported_ts or state.last_updated_ts
+                latest_states[entity_id] = (state.state_id, reported_ts)
+
     @override
     def _export_entries_queries(self, entries: list[States]) -> list[Insert | None]:
+        if self.downsampler is None:
+            sampled = [(state, state.old_state_id) for state in entries]
+        else:
+            sampled = self.downsampler.sample(entries)
+        states = [state for state, _ in sampled]
         return [
-            self._export_state_attributes_query(entries),
-            self._export_states_query(entries),
+            *self._export_state_attributes_queries(states),
+            self._export_states_query(sampled),
+            # rollups are built from every state, not only the exported ones
+            self._export_state_rollups_query(entries),
+            self._export_watermark_query(entries),
         ]
 
-    def _export_state_attributes_query(self, states: list[States]) -> Insert | None:
-        to_insert = [
-            {
-                ExportedStateAttributes.attributes_id: attr_id,
-                ExportedStateAttributes.value: model.to_native(),
-            }
-            for attr_id, model in {  # deduplicate attributes
-                state.attributes_id: state.state_attributes
-                for state in states
-                if state.attributes_id
-                if state.state_attributes
-            }.items()
+    @override
+    def _repair_entries_queries(self, entries: list[States]) -> list[Insert | None]:
+        # rollups and the watermark already include every exported state
+        return [
+            *self._export_state_attributes_queries(entries),
+            self._export_states_query(
+                [(state, state.old_state_id) for state in entries]
+            ),
         ]
 
-        if len(to_insert) == 0:
-            return None
-
-        return (
-            upsert(ExportedStateAttributes)
-            .values(to_insert)
-            .on_conflict(ExportedStateAttributes.attributes_id)
-            .update(*ExportedStateAttributes.__table__.columns)
+    def _export_state_attributes_queries(
+        self, states: list[States]
+    ) -> list[Insert | None]:
+        models = {  # deduplicate attributes
+            state.attributes_id: state.state_attributes
+            for state in states
+            if state.attributes_id
+            if state.state_attributes
+        }
+        return self._export_content_queries(
+            ExportedStateAttributes,
+            ExportedStateAttributes.attributes_id,
+            models,
+            [model.shared_attrs for model in models.values()],
         )
 
-    def _export_states_query(self, states: list[States]) -> Insert | None:
+    def _export_states_query(
+        self, states: list[tuple[States, int | None]]
+    ) -> Insert | None:
         to_insert = [
             {
                 ExportedStates.state_id: state.state_id,
@@ -75,7 +307,7 @@ class StateExporter(Exporter[States], LOGGER=_LOGGER):
                 ExportedStates.last_changed: state.last_changed_ts,
                 ExportedStates.last_reported: state.last_reported_ts,
                 ExportedStates.last_updated: state.last_updated_ts,
-                ExportedStates.old_state_id: state.old_state_id,
+                ExportedStates.old_state_id: old_state_id,
                 ExportedStates.origin_id: state.origin_idx,
                 ExportedStates.context_ulid: state.context_id_bin,
                 ExportedStates.context_user_hex: state.context_user_id_bin,
@@ -83,7 +315,7 @@ class StateExporter(Exporter[States], LOGGER=_LOGGER):
                 ExportedStates.entity_id: state.states_meta_rel.entity_id,
                 ExportedStates.attributes_id: state.attributes_id,
             }
-            for state in states
+            for state, old_state_id in states
         ]
 
         if len(to_insert) == 0:
@@ -95,3 +327,106 @@ class StateExporter(Exporter[States], LOGGER=_LOGGER):
             .on_conflict(ExportedStates.state_id)
             .update(*ExportedStates.__table__.columns)
         )
+
+    def _export_watermark_query(self, states: list[States]) -> Insert | None:
+        if self.downsampler is None or len(states) == 0:
+            return None
+
+        return (
+            upsert(ExporterWatermarks)
+            .values(
+                [
+                    {
+                        ExporterWatermarks.table_name: TABLE_EXPORTED_STATES,
+                        ExporterWatermarks.last_id: states[-1].state_id,
+                    }
+                ]
+            )
+            .on_conflict(ExporterWatermarks.table_name)
+            .update(ExporterWatermarks.last_id)
+        )
+
+    def _export_state_rollups_query(self, states: list[States]) -> Insert | None:
+        if not self.rollups:
+            return None
+
+        rollups: dict[tuple[str, float], _HourlyRollup] = {}
+        for state in states:
+            if (value := numeric_state(state.state)) is None:
+                continue
+            updated = state.last_updated_ts
+            start = updated - updated % ROLLUP_PERIOD
+            key = (state.states_meta_rel.entity_id, start)
+            if (rollup := rollups.get(key)) is None:
+                rollups[key] = _HourlyRollup(value, value, value, 1, value, updated)
+            else:
+                rollup.add(value, updated)
+
+        if len(rollups) == 0:
+            return None
+
+        # only the buckets touched by this batch are read back and merged
+        entity_ids = {entity_id for entity_id, _ in rollups}
+        starts = {start for _, start in rollups}
+        stmt = select(ExportedStatesHourly).filter(
+            ExportedStatesHourly.entity_id.in_(entity_ids),
+            ExportedStatesHourly.start_ts.in_(starts),
+        )
+        self._log_statement(stmt, self.export_session)
+        for row in self.export_session.scalars(stmt):
+            if (rollup := rollups.get((row.entity_id, row.start_ts))) is not None:
+                rollup.merge(row)
+
+        to_insert = [
+            {
+                ExportedStatesHourly.entity_id: entity_id,
+                ExportedStatesHourly.start_ts: start,
+                ExportedStatesHourly.min: rollup.min,
+                ExportedStatesHourly.max: rollup.max,
+                ExportedStatesHourly.mean: rollup.sum / rollup.count,
+                ExportedStatesHourly.sum: rollup.sum,
+                ExportedStatesHourly.count: rollup.count,
+                ExportedStatesHourly.last_value: rollup.last_value,
+                ExportedStatesHourly.last_updated: rollup.last_updated,
+            }
+            for (entity_id, start), rollup in rollups.items()
+        ]
+
+        return (
+            upsert(ExportedStatesHourly)
+            .values(to_insert)
+            .on_conflict(ExportedStatesHourly.entity_id, ExportedStatesHourly.start_ts)
+            .update(*ExportedStatesHourly.__table__.columns)
+        )
+
+
+@dataclass(slots=True)
+class _HourlyRollup:
+    """Running aggregate for a single entity and hour."""
+
+    min: float
+    max: float
+    sum: float
+    count: int
+    last_value: float
+    last_updated: float
+
+    def add(self, value: float, updated: float) -> None:
+        """Add a single state value to the aggregate."""
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.sum += value
+        self.count += 1
+        if updated >= self.last_updated:
+            self.last_value = value
+            self.last_updated = updated
+
+    def merge(self, row: ExportedStatesHourly) -> None:
+        """Merge a previously exported aggregate into this one."""
+        self.min = min(self.min, row.min)
+        self.max = max(self.max, row.max)
+        self.sum += row.sum
+        self.count += row.count
+        if row.last_updated > self.last_updated:
+            self.last_value = row.last_value
+            self.last_updated = row.last_updated
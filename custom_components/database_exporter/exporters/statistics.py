@@ -0,0 +1,177 @@
+"""Statistics Exporters for the database exporter component."""
+
+from collections.abc import Sequence
+import logging
+from typing import override
+
+from sqlalchemy import ColumnElement, Insert, Row, Select, func, select
+
+from homeassistant.components.recorder import get_instance as get_recorder_instance
+from homeassistant.components.recorder.db_schema import (
+    Statistics,
+    StatisticsMeta,
+    StatisticsShortTerm,
+)
+
+from ..db_schema import (
+    ExportedStatistics,
+    ExportedStatisticsMeta,
+    ExportedStatisticsShortTerm,
+)
+from ..upsert import upsert
+from ..verify import ChecksumColumns
+from .base import Exporter
+
+_LOGGER = logging.getLogger(__name__)
+
+type StatisticsModel = Statistics | StatisticsShortTerm
+type ExportedStatisticsModel = ExportedStatistics | ExportedStatisticsShortTerm
+type StatisticsRow = Row[tuple[StatisticsModel, StatisticsMeta | None]]
+
+
+class _StatisticsExporter(Exporter[StatisticsRow], LOGGER=_LOGGER):
+    """Base exporter for statistics tables.
+
+    The recorder updates statistics in place when sums are adjusted or
+    statistics are imported, which the ID watermark doesn't pick up. Verify
+    compares a checksum of their values too, and exports changed rows again.
+    """
+
+    source_model: type[StatisticsModel]
+    exported_model: type[ExportedStatisticsModel]
+
+    @override
+    def _latest_exported_id_query(self) -> Select[tuple[int]]:
+        statistics_id = self.exported_model.statistics_id
+        return select(statistics_id).order_by(statistics_id.desc()).limit(1)
+
+    @override
+    def _recorder_entries_query(
+        self, start_id: float, limit: int
+    ) -> Select[tuple[StatisticsModel, StatisticsMeta | None]]:
+        source = self.source_model
+        return (
+            select(source, StatisticsMeta)
+            .outerjoin(StatisticsMeta, source.metadata_id == StatisticsMeta.id)
+            .filter(source.id > start_id)
+            .order_by(source.id.asc())
+            .limit(limit)
+        )
+
+    @override
+    def _get_recorder_entries(
+        self, start_id: float, limit: int
+    ) -> Sequence[StatisticsRow]:
+        stmt = self._recorder_entries_query(start_id, limit)
+        session = get_recorder_instance(self.hass).get_session()
+        try:
+            self._log_statement(stmt, session)
+            results = session.execute(stmt).all()
+        finally:
+            session.close()
+        return results
+
+    @override
+    def _entry_id(self, entry: StatisticsRow) -> int:
+        return entry[0].id
+
+    @override
+    def _checksum_columns(self) -> ChecksumColumns:
+        return ChecksumColumns(
+            self.source_model.id,
+            self.source_model.start_ts,
+            self.exported_model.statistics_id,
+            self.exported_model.start_ts,
+            _values_checksum(self.source_model),
+            _values_checksum(self.exported_model),
+        )
+
+    @override
+    def _export_entries_queries(
+        self, entries: list[StatisticsRow]
+    ) -> list[Insert | None]:
+        return [
+            self._export_statistics_meta_query(entries),
+            self._export_statistics_query(entries),
+        ]
+
+    def _export_statistics_meta_query(self, rows: list[StatisticsRow]) -> Insert | None:
+        to_insert = [
+            {
+                ExportedStatisticsMeta.metadata_id: metadata_id,
+                ExportedStatisticsMeta.statistic_id: meta.statistic_id,
+                ExportedStatisticsMeta.source: meta.source,
+                ExportedStatisticsMeta.unit_of_measurement: meta.unit_of_measurement,
+                ExportedStatisticsMeta.has_mean: meta.has_mean,
+                ExportedStatisticsMeta.mean_type: meta.mean_type,
+                ExportedStatisticsMeta.has_sum: meta.has_sum,
+                ExportedStatisticsMeta.name: meta.name,
+            }
+            for metadata_id, meta in {  # deduplicate metadata
+                meta.id: meta for _, meta in rows if meta
+            }.items()
+        ]
+
+        if len(to_insert) == 0:
+            return None
+
+        return (
+            upsert(ExportedStatisticsMeta)
+            .values(to_insert)
+            .on_conflict(ExportedStatisticsMeta.metadata_id)
+            .update(*ExportedStatisticsMeta.__table__.columns)
+        )
+
+    def _export_statistics_query(self, rows: list[StatisticsRow]) -> Insert | None:
+        model = self.exported_model
+        to_insert = [
+            {
+                model.statistics_id: statistics.id,
+                model.created_ts: statistics.created_ts,
+                model.start_ts: statistics.start_ts,
+                model.mean: statistics.mean,
+                model.min: statistics.min,
+                model.max: statistics.max,
+                model.last_reset_ts: statistics.last_reset_ts,
+                model.state: statistics.state,
+                model.sum: statistics.sum,
+                model.metadata_id: meta.id if meta else None,
+            }
+            for statistics, meta in rows
+        ]
+
+        if len(to_insert) == 0:
+            return None
+
+        return (
+            upsert(model)
+            .values(to_insert)
+            .on_conflict(model.statistics_id)
+            .update(*model.__table__.columns)
+        )
+
+
+def _values_checksum(
+    model: type[StatisticsModel | ExportedStatisticsModel],
+) -> ColumnElement[float]:
+    return (
+        func.coalesce(model.mean, 0)
+        + func.coalesce(model.min, 0)
+        + func.coalesce(model.max, 0)
+        + func.coalesce(model.state, 0)
+        + func.coalesce(model.sum, 0)
+    )
+
+
+class StatisticsExporter(_StatisticsExporter, LOGGER=_LOGGER):
+    """Exporter for long-term statistics."""
+
+    source_model = Statistics
+    exported_model = ExportedStatistics
+
+
+class ShortTermStatisticsExporter(_StatisticsExporter, LOGGER=_LOGGER):
+    """Exporter for short-term statistics."""
+
+    source_model = StatisticsShortTerm
+    exported_model = ExportedStatisticsShortTerm
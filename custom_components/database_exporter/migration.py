@@ -0,0 +1,141 @@
+"""Schema migration for the Database Exporter integration."""
+
+from collections.abc import Callable
+import logging
+import time
+
+from sqlalchemy import Column, Connection, Engine, Float, func, insert, inspect, select
+
+from .db_schema import (
+    SCHEMA_VERSION,
+    TABLE_EXPORTED_EVENTS,
+    TABLE_EXPORTER_SCHEMA_CHANGES,
+    Base,
+    ExportedEventData,
+    ExportedStateAttributes,
+    ExportedStatisticsMeta,
+    ExporterSchemaChanges,
+)
+from .models import DatabaseExportManagerError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _add_column(conn: Connection, column: Column) -> None:
+    preparer = conn.dialect.identifier_preparer
+    table = preparer.format_table(column.table)
+    name = preparer.format_column(column)
+    type_ = column.type.compile(dialect=conn.dialect)
+    conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {name} {type_}")
+
+
+def _modify_column(conn: Connection, column: Column) -> None:
+    preparer = conn.dialect.identifier_preparer
+    table = preparer.format_table(column.table)
+    name = preparer.format_column(column)
+    type_ = column.type.compile(dialect=conn.dialect)
+    null = "NULL" if column.nullable else "NOT NULL"
+    conn.exec_driver_sql(f"ALTER TABLE {table} MODIFY {name} {type_} {null}")
+
+
+def _add_missing_columns(conn: Connection, *columns: Column) -> None:
+    # DDL isn't transactional on MySQL and MariaDB, so a retried migration
+    # may find columns it added before failing
+    inspector = inspect(conn)
+    for column in columns:
+        if not inspector.has_table(column.table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(column.table.name)}
+        if column.name not in existing:
+            _add_column(conn, column)
+
+
+def _migrate_to_3(conn: Connection) -> None:
+    # attributes and event data can be stored by content hash
+    _add_missing_columns(
+        conn,
+        ExportedEventData.__table__.c.content_hash,
+        ExportedStateAttributes.__table__.c.content_hash,
+    )
+
+
+def _migrate_to_5(conn: Connection) -> None:
+    # timestamps and values were stored in single precision on MySQL and MariaDB
+    if conn.dialect.name not in ("mysql", "mariadb"):
+        return
+    inspector = inspect(conn)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        for column in table.columns:
+            if isinstance(column.type, Float):
+                _modify_column(conn, column)
+
+
+def _migrate_to_6(conn: Connection) -> None:
+    # non-unique indexes kept indexed columns from being updated on DuckDB
+    if conn.dialect.name != "duckdb":
+        return
+    preparer = conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            if not index.unique:
+                name = preparer.quote(index.name)
+                conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+
+
+def _migrate_to_7(conn: Connection) -> None:
+    # statistics metadata gained the recorder's mean type
+    _add_missing_columns(conn, ExportedStatisticsMeta.__table__.c.mean_type)
+
+
+# Schema version 1 is the original schema, from before versions were tracked.
+# Migrations are keyed by the version they migrate to, and run before any new
+# tables are created. Versions that only add tables don't need a migration.
+_MIGRATIONS: dict[int, Callable[[Connection], None]] = {
+    3: _migrate_to_3,
+    5: _migrate_to_5,
+    6: _migrate_to_6,
+    7: _migrate_to_7,
+}
+
+
+def migrate_schema(engine: Engine) -> None:
+    """Bring the target schema up to date, if it isn't already.
+
+    The schema version is read from a single small table, so connecting to
+    an up to date target doesn't reflect or create any other tables.
+    """
+    current = _get_schema_version(engine)
+    if current == SCHEMA_VERSION:
+        _LOGGER.debug("Schema is up to date at version %d", current)
+        return
+    if current is not None and current > SCHEMA_VERSION:
+        raise DatabaseExportManagerError(
+            f"Schema version {current} is newer than supported {SCHEMA_VERSION}"
+        )
+
+    _LOGGER.debug("Migrating schema from version %s to %d", current, SCHEMA_VERSION)
+    with engine.begin() as conn:
+        if current is not None:
+            for version in range(current + 1, SCHEMA_VERSION + 1):
+                if (migration := _MIGRATIONS.get(version)) is not None:
+                    _LOGGER.debug("Migrating to schema version %d", version)
+                    migration(conn)
+        Base.metadata.create_all(conn)
+        conn.execute(
+            insert(ExporterSchemaChanges).values(
+                schema_version=SCHEMA_VERSION, changed_ts=time.time()
+            )
+        )
+
+
+def _get_schema_version(engine: Engine) -> int | None:
+    with engine.connect() as conn:
+        inspector = inspect(conn)
+        if inspector.has_table(TABLE_EXPORTER_SCHEMA_CHANGES):
+            stmt = select(func.max(ExporterSchemaChanges.schema_version))
+            return conn.execute(stmt).scalar()
+        if inspector.has_table(TABLE_EXPORTED_EVENTS):
+            return 1
+        return None
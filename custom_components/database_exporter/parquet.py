@@ -0,0 +1,326 @@
+"""Parquet file export target for the Database Exporter integration."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Callable, Sequence
+from copy import deepcopy
+from datetime import UTC, datetime
+from importlib.util import find_spec
+import logging
+from pathlib import Path
+import tempfile
+from typing import TYPE_CHECKING, Any
+from urllib.parse import urlsplit
+import uuid
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Float,
+    Integer,
+    LargeBinary,
+    Select,
+    SmallInteger,
+    String,
+    Table,
+)
+
+from homeassistant.helpers.json import save_json
+from homeassistant.util.json import load_json_object
+
+from .db_schema import (
+    TABLE_EXPORTED_EVENTS,
+    TABLE_EXPORTED_STATES,
+    TABLE_EXPORTED_STATISTICS,
+    TABLE_EXPORTED_STATISTICS_SHORT_TERM,
+)
+from .models import DatabaseExportManagerError
+from .transform import json_serializer
+from .upsert import Upsert
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+_LOGGER = logging.getLogger(__name__)
+
+PARQUET_SCHEME = "parquet"
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+FLUSH_ROWS = 250_000
+# segments with fewer rows are merged once a partition has enough of them
+SEGMENT_ROWS = 1_000_000
+COMPACT_SEGMENTS = 8
+
+# (timestamp column to partition by date, entity ID column to partition by domain)
+_PARTITIONS: dict[str, tuple[str, str | None]] = {
+    TABLE_EXPORTED_EVENTS: ("time_fired_ts", None),
+    TABLE_EXPORTED_STATES: ("last_updated", "entity_id"),
+    TABLE_EXPORTED_STATISTICS: ("start_ts", None),
+    TABLE_EXPORTED_STATISTICS_SHORT_TERM: ("start_ts", None),
+}
+
+
+def is_parquet_url(db_url: str) -> bool:
+    """Return whether the URL points to a Parquet export target."""
+    return urlsplit(db_url).scheme == PARQUET_SCHEME
+
+
+def open_parquet_target(
+    resolve_path: Callable[[str], str], db_url: str
+) -> ParquetExportTarget:
+    """Open the Parquet export target for a `parquet:///path` URL."""
+    require_pyarrow()
+    target = ParquetExportTarget(Path(resolve_path(urlsplit(db_url).path)))
+    target.open()
+    return target
+
+
+def check_parquet_target(resolve_path: Callable[[str], str], db_url: str) -> None:
+    """Check a `parquet:///path` URL points to a directory that can be written.
+
+    Unlike opening the target, this leaves existing segments alone.
+    """
+    require_pyarrow()
+    path = Path(resolve_path(urlsplit(db_url).path))
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryFile(dir=path) as file:
+            file.write(b"\0")
+    except OSError as error:
+        raise DatabaseExportManagerError("Parquet target is not writable") from error
+
+
+def require_pyarrow() -> None:
+    """Raise if pyarrow, which Parquet targets need, isn't installed."""
+    if find_spec("pyarrow") is None:
+        raise DatabaseExportManagerError(
+            "Parquet targets require the pyarrow package, which isn't installed"
+        )
+
+
+class ParquetExportTarget:
+    """Append-only export target writing compressed Parquet segments.
+
+    Rows from the exporters' upserts are buffered per table and written out
+    as zstd-compressed segments, hive-partitioned by date and, for states, by
+    domain. `manifest.json` lists every committed segment along with each
+    table's key column and watermark, so readers can scan only committed
+    segments, deduplicate by key, and append incrementally. Segments are only
+    committed once the manifest has been replaced; anything else left in the
+    directory is removed the next time the target is opened.
+
+    Each flush adds a segment to every partition it touches, so a partition
+    that collects `COMPACT_SEGMENTS` small segments has them merged into one,
+    keeping the latest version of each row. Merged segments replace the
+    small ones in the same manifest commit.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """Initialize the target."""
+        self.path = path
+        self._manifest: dict[str, Any] = {"version": MANIFEST_VERSION, "tables": {}}
+        self._buffers: dict[Table, list[dict[str, Any]]] = defaultdict(list)
+        self._buffered_rows = 0
+        self._watermarks: dict[str, int] = {}
+
+    def open(self) -> None:
+        """Load the manifest and remove uncommitted segments."""
+        try:
+            self.path.mkdir(parents=True, exist_ok=True)
+            manifest_path = self.path / MANIFEST_FILE
+            if manifest_path.exists():
+                self._manifest = load_json_object(manifest_path)
+
+            committed = {
+                segment["path"]
+                for table in self._manifest["tables"].values()
+                for segment in table["segments"]
+            }
+            for file in self.path.rglob("*.parquet"):
+                if file.relative_to(self.path).as_posix() not in committed:
+                    _LOGGER.debug("Removing uncommitted segment %s", file)
+                    file.unlink()
+        except (OSError, ValueError) as error:
+            raise DatabaseExportManagerError("Parquet target init failed") from error
+
+        self.discard()
+
+    def latest_exported_id(self, stmt: Select[tuple[int]]) -> int | None:
+        """Return the watermark for the column selected by an exporter query."""
+        column = stmt.selected_columns[0]
+        table = self._manifest["tables"].get(column.table.name)
+        if table is None or table["key"] != column.name:
+            return None
+        return self._watermarks.get(column.table.name)
+
+    def write(self, stmts: Sequence[Upsert | None]) -> None:
+        """Buffer the rows of a batch of upserts."""
+        for stmt in stmts:
+            if stmt is None:
+                continue
+            table = stmt.target
+            key = stmt.conflict_key
+            rows = stmt.rows()
+
+            info = self._manifest["tables"].setdefault(
+                table.name, {"key": key, "watermark": None, "segments": []}
+            )
+            watermark = max(row[info["key"]] for row in rows)
+            current = self._watermarks.get(table.name)
+            self._watermarks[table.name] = max(watermark, current or watermark)
+
+            self._buffers[table].extend(rows)
+            self._buffered_rows += len(rows)
+
+        if self._buffered_rows >= FLUSH_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered rows as segments and commit them to the manifest."""
+        if not self._buffers:
+            return
+
+        run = f"{datetime.now(UTC):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        manifest = deepcopy(self._manifest)
+        replaced: list[str] = []
+        try:
+            for table, rows in self._buffers.items():
+                info = manifest["tables"][table.name]
+                for partition, part_rows in _partition(table, rows).items():
+                    part_rows.sort(key=lambda row: row[info["key"]])
+                    relative = f"{table.name}/{partition}part-{run}.parquet"
+                    _write_segment(table, part_rows, self.path / relative)
+                    info["segments"].append({"path": relative, "rows": len(part_rows)})
+                    replaced += self._compact(info, f"{table.name}/{partition}", run)
+                info["watermark"] = self._watermarks.get(table.name)
+
+            save_json(str(self.path / MANIFEST_FILE), manifest, atomic_writes=True)
+        except Exception as error:
+            self.discard()
+            raise DatabaseExportManagerError("Parquet flush failed") from error
+
+        _LOGGER.debug("Committed %d rows to %s", self._buffered_rows, self.path)
+        self._manifest = manifest
+        self._buffers.clear()
+        self._buffered_rows = 0
+
+        # segments left behind are removed the next time the target is opened
+        for relative in replaced:
+            (self.path / relative).unlink(missing_ok=True)
+
+    def _compact(self, info: dict[str, Any], prefix: str, run: str) -> list[str]:
+        """Merge the small segments of a partition, returning the replaced paths."""
+        small = [
+            segment
+            for segment in info["segments"]
+            if segment["path"].rpartition("/")[0] + "/" == prefix
+            and segment["rows"] < SEGMENT_ROWS
+        ]
+        if len(small) < COMPACT_SEGMENTS:
+            return []
+
+        paths = [segment["path"] for segment in small]
+        data = _merge_segments([self.path / path for path in paths], info["key"])
+        relative = f"{prefix}compact-{run}.parquet"
+        _write_arrow(data, self.path / relative)
+        _LOGGER.debug("Merged %d segments into %s", len(small), relative)
+        info["segments"] = [
+            segment for segment in info["segments"] if segment["path"] not in paths
+        ]
+        info["segments"].append({"path": relative, "rows": data.num_rows})
+        return paths
+
+    def discard(self) -> None:
+        """Drop buffered rows and reset watermarks to the committed ones."""
+        self._buffers.clear()
+        self._buffered_rows = 0
+        self._watermarks = {
+            name: table["watermark"]
+            for name, table in self._manifest["tables"].items()
+            if table["watermark"] is not None
+        }
+
+
+def _partition(
+    table: Table, rows: list[dict[str, Any]]
+) -> dict[str, list[dict[str, Any]]]:
+    if table.name not in _PARTITIONS:
+        return {"": rows}
+
+    ts_column, entity_column = _PARTITIONS[table.name]
+    partitions: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        partition = ""
+        if (ts := row[ts_column]) is not None:
+            partition += f"date={datetime.fromtimestamp(ts, UTC):%Y-%m-%d}/"
+        if entity_column is not None:
+            partition += f"domain={row[entity_column].partition('.')[0]}/"
+        partitions[partition].append(row)
+    return partitions
+
+
+def _arrow_type(column_type: Any) -> pa.DataType:
+    import pyarrow as pa  # noqa: PLC0415
+
+    match column_type:
+        case Boolean():
+            return pa.bool_()
+        case SmallInteger():
+            return pa.int16()
+        case Integer():
+            return pa.int64()
+        case Float():
+            return pa.float64()
+        case String() | JSON():
+            return pa.string()
+        case LargeBinary():
+            return pa.binary()
+    raise TypeError(f"No Parquet type for column type {column_type!r}")
+
+
+def to_arrow_table(table: Table, rows: list[dict[str, Any]]) -> pa.Table:
+    """Convert rows keyed by column name to an Arrow table for `table`."""
+    import pyarrow as pa  # noqa: PLC0415
+
+    # the surrogate `id` column only has meaning inside a relational target
+    columns = [column for column in table.columns if column.name != "id"]
+    schema = pa.schema([(column.name, _arrow_type(column.type)) for column in columns])
+    arrays = {}
+    for column in columns:
+        values = [row.get(column.name) for row in rows]
+        if isinstance(column.type, JSON):
+            values = [_json_value(value) for value in values]
+        arrays[column.name] = values
+    return pa.Table.from_pydict(arrays, schema=schema)
+
+
+def _json_value(value: Any) -> str | None:
+    if value is None:
+        return None
+    if value is JSON.NULL:
+        return "null"
+    return json_serializer(value)
+
+
+def _merge_segments(paths: list[Path], key: str) -> pa.Table:
+    import pyarrow as pa  # noqa: PLC0415
+    import pyarrow.parquet as pq  # noqa: PLC0415
+
+    data = pa.concat_tables(
+        [pq.ParquetFile(path).read() for path in paths], promote_options="default"
+    )
+    # later segments hold the latest version of a row
+    latest = {value: index for index, value in enumerate(data.column(key).to_pylist())}
+    return data.take([latest[value] for value in sorted(latest)])
+
+
+def _write_segment(table: Table, rows: list[dict[str, Any]], path: Path) -> None:
+    _write_arrow(to_arrow_table(table, rows), path)
+
+
+def _write_arrow(data: pa.Table, path: Path) -> None:
+    import pyarrow.parquet as pq  # noqa: PLC0415
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(data, path, compression="zstd")
@@ -0,0 +1,121 @@
+"""Shared recorder reader for the Database Exporter integration."""
+
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_right
+from collections.abc import Sequence
+from dataclasses import dataclass
+from functools import partial
+import logging
+import time
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from homeassistant.components.recorder import get_instance as get_recorder_instance
+from homeassistant.core import HomeAssistant
+
+if TYPE_CHECKING:
+    from .exporters import Exporter
+
+_LOGGER = logging.getLogger(__name__)
+
+SourceModel = TypeVar("SourceModel")
+
+MAX_CACHED_PAGES = 16
+PAGE_TTL = 120
+
+
+@dataclass(slots=True)
+class _Page:
+    """A page of recorder entries read after a given ID."""
+
+    start_id: float
+    ids: list[int]
+    entries: Sequence[Any]
+    read_at: float
+
+
+class RecorderReader:
+    """Read recorder pages once and share them across all export targets.
+
+    Every loaded config entry exports from the same recorder, so targets that
+    are exporting at the same time usually request the same pages. Pages are
+    cached briefly and in-flight reads are joined, while each target keeps its
+    own watermark and reads past the cache when it falls behind or gets ahead.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the reader."""
+        self.hass = hass
+        self._pages: dict[type, list[_Page]] = {}
+        self._pending: dict[tuple[type, float, int], asyncio.Task[_Page]] = {}
+
+    async def async_get_entries(
+        self, exporter: Exporter[SourceModel], start_id: float, limit: int
+    ) -> Sequence[SourceModel]:
+        """Get up to `limit` recorder entries after `start_id` for an exporter."""
+        kind = type(exporter)
+
+        if (entries := self._get_cached(kind, start_id)) is not None:
+            _LOGGER.debug("Serving %s entries after %s from cache", kind, start_id)
+            return entries
+
+        key = (kind, start_id, limit)
+        if (pending := self._pending.get(key)) is not None:
+            _LOGGER.debug("Joining pending read of %s after %s", kind, start_id)
+        else:
+            # no requester owns the read, so cancelling one of them, e.g. when
+            # its entry unloads, doesn't abort it for the others
+            pending = self.hass.async_create_background_task(
+                self._async_read(exporter, start_id, limit),
+                f"database_exporter read of {kind.__name__} after {start_id}",
+            )
+            self._pending[key] = pending
+            pending.add_done_callback(partial(self._read_done, key))
+
+        return (await asyncio.shield(pending)).entries
+
+    async def _async_read(
+        self, exporter: Exporter[Any], start_id: float, limit: int
+    ) -> _Page:
+        rec_exec = get_recorder_instance(self.hass).async_add_executor_job
+        entries = await rec_exec(exporter._get_recorder_entries, start_id, limit)  # noqa: SLF001
+        page = _Page(
+            start_id,
+            [exporter._entry_id(entry) for entry in entries],  # noqa: SLF001
+            entries,
+            time.monotonic(),
+        )
+        self._store(type(exporter), page)
+        return page
+
+    def _read_done(
+        self, key: tuple[type, float, int], task: asyncio.Task[_Page]
+    ) -> None:
+        del self._pending[key]
+        if not task.cancelled():
+            task.exception()  # requesters re-raise; don't warn if all left
+
+    def clear(self) -> None:
+        """Drop all cached pages."""
+        self._pages.clear()
+
+    def _get_cached(self, kind: type, start_id: float) -> Sequence[Any] | None:
+        pages = self._pages.get(kind)
+        if not pages:
+            return None
+
+        expired = time.monotonic() - PAGE_TTL
+        pages[:] = [page for page in pages if page.read_at > expired]
+
+        for page in pages:
+            if page.ids and page.start_id <= start_id < page.ids[-1]:
+                return page.entries[bisect_right(page.ids, start_id) :]
+        return None
+
+    def _store(self, kind: type, page: _Page) -> None:
+        if not page.ids:
+            return
+        pages = self._pages.setdefault(kind, [])
+        pages.append(page)
+        del pages[:-MAX_CACHED_PAGES]
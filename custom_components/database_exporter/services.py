@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+from dataclasses import asdict
 import logging
 from typing import TYPE_CHECKING
 
@@ -12,10 +14,12 @@ from homeassistant.core import (
     HomeAssistantError,
     ServiceCall,
     ServiceResponse,
+    SupportsResponse,
     callback,
 )
+from homeassistant.util.json import JsonValueType
 
-from .const import DOMAIN, SERVICE_EXPORT
+from .const import ATTR_TIME_BUDGET, DOMAIN, SERVICE_EXPORT, SERVICE_VERIFY
 
 if TYPE_CHECKING:
     from . import DatabaseExporterConfigEntry
@@ -23,6 +27,13 @@ if TYPE_CHECKING:
 _LOGGER = logging.getLogger(__name__)
 
 SERVICE_EXPORT_SCHEMA = vol.Schema({})
+SERVICE_VERIFY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_TIME_BUDGET, default=10): vol.All(
+            vol.Coerce(float), vol.Range(min=0.1, max=3600)
+        ),
+    }
+)
 
 
 @callback
@@ -32,21 +43,68 @@ def async_setup_services(hass: HomeAssistant) -> None:
     async def handle_export(call: ServiceCall) -> ServiceResponse:
         _LOGGER.debug("Handling export service call")
 
+        entries = _get_entries(hass)
+
+        # run every target at once so they share recorder reads
+        results = await asyncio.gather(
+            *(_async_export_entry(entry) for entry in entries),
+            return_exceptions=True,
+        )
+
+        response: dict[str, JsonValueType] = {}
+        for entry, result in zip(entries, results, strict=True):
+            if isinstance(result, BaseException):
+                raise HomeAssistantError("Failed to run export") from result
+            response[entry.entry_id] = {"started": result, "joined": not result}
+
+        return {"entries": response} if call.return_response else None
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT,
+        handle_export,
+        schema=SERVICE_EXPORT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def handle_verify(call: ServiceCall) -> ServiceResponse:
+        _LOGGER.debug("Handling verify service call")
+
+        time_budget: float = call.data[ATTR_TIME_BUDGET]
+        response: dict[str, JsonValueType] = {}
         for entry in _get_entries(hass):
-            _LOGGER.debug("Running export for entry: %s", entry.entry_id)
+            _LOGGER.debug("Running verification for entry: %s", entry.entry_id)
 
             try:
-                await entry.runtime_data.async_export_data()
+                results = await entry.runtime_data.async_verify_data(time_budget)
             except Exception as err:
-                _LOGGER.exception("Error exporting data for entry %s:", entry.entry_id)
-                raise HomeAssistantError("Failed to run export") from err
+                _LOGGER.exception("Error verifying data for entry %s:", entry.entry_id)
+                raise HomeAssistantError("Failed to run verification") from err
+
+            response[entry.entry_id] = {
+                table: asdict(result) for table, result in results.items()
+            }
 
-        return None
+        return {"entries": response} if call.return_response else None
 
     hass.services.async_register(
-        DOMAIN, SERVICE_EXPORT, handle_export, schema=SERVICE_EXPORT_SCHEMA
+        DOMAIN,
+        SERVICE_VERIFY,
+        handle_verify,
+        schema=SERVICE_VERIFY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
     )
 
 
+async def _async_export_entry(entry: DatabaseExporterConfigEntry) -> bool:
+    _LOGGER.debug("Running export for entry: %s", entry.entry_id)
+
+    try:
+        return await entry.runtime_data.async_export_data()
+    except Exception:
+        _LOGGER.exception("Error exporting data for entry %s:", entry.entry_id)
+        raise
+
+
 def _get_entries(hass: HomeAssistant) -> list[DatabaseExporterConfigEntry]:
     return hass.config_entries.async_loaded_entries(DOMAIN)
@@ -0,0 +1,65 @@
+"""Export throttling for the Database Exporter integration."""
+
+import asyncio
+import logging
+import time
+
+from homeassistant.components.recorder import get_instance as get_recorder_instance
+from homeassistant.core import HomeAssistant
+
+_LOGGER = logging.getLogger(__name__)
+
+BUSY_BACKLOG = 10
+MIN_BACKOFF = 0.1
+MAX_BACKOFF = 5.0
+MAX_BUSY_WAIT = 30.0
+
+
+class ExportThrottle:
+    """Pace export batches so the recorder can keep up with its own commits.
+
+    Between batches the recorder queue backlog is checked; while it is above
+    `BUSY_BACKLOG` the export backs off, up to `MAX_BUSY_WAIT` per batch. An
+    optional rows per second ceiling is enforced with a simple token bucket.
+    When the recorder is idle and no ceiling is set, the throttle only yields
+    to the event loop, so catch-up runs at full speed.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_rows_per_second: int = 0) -> None:
+        """Initialize the throttle."""
+        self.hass = hass
+        self.max_rows_per_second = max_rows_per_second
+        self._next_batch_at = 0.0
+
+    async def async_wait(self, rows: int) -> None:
+        """Wait before the next batch, given the size of the last one."""
+        await self._async_wait_for_rate(rows)
+        await self._async_wait_for_recorder()
+
+    async def _async_wait_for_rate(self, rows: int) -> None:
+        if self.max_rows_per_second <= 0:
+            await asyncio.sleep(0)
+            return
+
+        now = time.monotonic()
+        start = max(now, self._next_batch_at)
+        self._next_batch_at = start + rows / self.max_rows_per_second
+        if (delay := self._next_batch_at - now) > 0:
+            _LOGGER.debug("Rate limited, sleeping %.2f seconds", delay)
+            await asyncio.sleep(delay)
+
+    async def _async_wait_for_recorder(self) -> None:
+        recorder = get_recorder_instance(self.hass)
+        backoff = MIN_BACKOFF
+        waited = 0.0
+        while recorder.backlog > BUSY_BACKLOG and waited < MAX_BUSY_WAIT:
+            _LOGGER.debug(
+                "Recorder backlog is %d, sleeping %.2f seconds",
+                recorder.backlog,
+                backoff,
+            )
+            await asyncio.sleep(backoff)
+            waited += backoff
+            backoff = min(backoff * 2, MAX_BACKOFF)
+        if waited >= MAX_BUSY_WAIT:
+            _LOGGER.debug("Recorder still busy, continuing export anyway")
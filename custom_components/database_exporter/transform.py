@@ -0,0 +1,24 @@
+"""Row value transformation for the Database Exporter integration."""
+
+from typing import Any
+
+from homeassistant.helpers.json import json_dumps
+
+
+class JSONText(str):
+    """JSON that is already serialized, such as a recorder attributes blob.
+
+    The recorder stores attributes and event data as JSON text. Binding that
+    text as is skips decoding it into Python objects only for the target
+    engine to encode them again, which was most of the CPU time spent
+    building a batch.
+    """
+
+    __slots__ = ()
+
+
+def json_serializer(value: Any) -> str:
+    """Serialize a JSON column value, passing serialized JSON through."""
+    if isinstance(value, JSONText):
+        return value
+    return json_dumps(value)
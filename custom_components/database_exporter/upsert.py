@@ -1,21 +1,27 @@
 """Custom Upsert class for handling insert or update operations."""
 
 from collections.abc import Sequence
+from importlib.util import find_spec
+import logging
 from typing import Any, Self, TypeVar, Union
 
-from sqlalchemy import Insert
-from sqlalchemy.dialects.mysql import insert as mysql_insert
-from sqlalchemy.dialects.postgresql import insert as pg_insert
-from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy import Insert, Table, inspect
 from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
 from sqlalchemy.sql._typing import _DMLColumnKeyMapping, _DMLTableArgument
 from sqlalchemy.sql.compiler import Compiled
 from sqlalchemy.sql.expression import ClauseElement, Executable
 from sqlalchemy.sql.roles import DDLConstraintColumnRole
 from sqlalchemy.sql.schema import Column as ColumnObject
 
+_LOGGER = logging.getLogger(__name__)
+
 InsertT = TypeVar("InsertT", bound="Insert")
 
+DUCKDB_BULK_ROWS = 500
+# the bulk path registers an Arrow table, so it needs pyarrow
+_HAS_PYARROW = find_spec("pyarrow") is not None
+
 type Column = Union[ColumnObject[Any], str, DDLConstraintColumnRole]
 type ValueArg = Union[_DMLColumnKeyMapping[Any], Sequence[Any]]
 
@@ -54,12 +60,88 @@ class Upsert(Executable, ClauseElement):
         self.update_columns = [_extract_column_name(col) for col in columns]
         return self
 
+    @property
+    def target(self) -> Table:
+        """The table being inserted into."""
+        if isinstance(self.table, Table):
+            return self.table
+        return inspect(self.table).local_table
+
+    @property
+    def conflict_key(self) -> str:
+        """The name of the first conflict column."""
+        return _column_key(self.conflict_columns[0])
+
+    def rows(self) -> list[dict[str, Any]]:
+        """Return the values to insert as rows keyed by column name."""
+        return [
+            {_column_key(col): value for col, value in row.items()}
+            for row in self.values_args[0]
+        ]
+
 
 def upsert(table: _DMLTableArgument) -> Upsert:
     """Construct an Upsert object."""
     return Upsert(table)
 
 
+def execute_upsert(session: Session, stmt: Upsert) -> None:
+    """Execute an upsert, using bulk insertion where the dialect benefits."""
+    if (
+        _HAS_PYARROW
+        and session.get_bind().dialect.name == "duckdb"
+        and len(stmt.values_args[0]) >= DUCKDB_BULK_ROWS
+    ):
+        _execute_upsert_duckdb_bulk(session, stmt)
+    else:
+        session.execute(stmt)
+
+
+def _execute_upsert_duckdb_bulk(session: Session, el: Upsert) -> None:
+    # DuckDB parses large multi-row VALUES lists slowly, so insert straight from
+    # an Arrow table registered on the underlying DuckDB connection instead.
+    from .parquet import to_arrow_table  # noqa: PLC0415
+
+    table = el.target
+    preparer = session.get_bind().dialect.identifier_preparer
+    data = to_arrow_table(table, el.rows())
+    columns = ", ".join(preparer.quote(name) for name in data.column_names)
+    conflict = ", ".join(preparer.quote(_column_key(c)) for c in el.conflict_columns)
+    updates = [
+        f"{preparer.quote(name)} = excluded.{preparer.quote(name)}"
+        for name in _duckdb_update_columns(el)
+    ]
+    action = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+
+    conn = session.connection().connection.driver_connection
+    conn.register("export_batch", data)
+    try:
+        conn.execute(
+            f"INSERT INTO {preparer.format_table(table)} ({columns}) "  # noqa: S608
+            f"SELECT {columns} FROM export_batch ON CONFLICT ({conflict}) {action}"
+        )
+    finally:
+        conn.unregister("export_batch")
+
+
+def _duckdb_update_columns(el: Upsert) -> list[str]:
+    # DuckDB can't assign to key or indexed columns in ON CONFLICT DO UPDATE.
+    # Only unique indexes are created on DuckDB, and those should only cover
+    # the columns upserts conflict on.
+    table = el.target
+    primary_key = {column.name for column in table.primary_key}
+    unique = set()
+    for index in table.indexes:
+        if index.unique:
+            unique.update(column.name for column in index.columns)
+    conflict = {_column_key(column) for column in el.conflict_columns}
+    if skipped := [c for c in el.update_columns if c in unique - conflict]:
+        _LOGGER.warning(
+            "Can't update unique columns %s of %s on DuckDB", skipped, table.name
+        )
+    return [c for c in el.update_columns if c not in primary_key | unique]
+
+
 def _extract_column_name(col: Column) -> str:
     if isinstance(col, ColumnObject):
         return col.name
@@ -68,12 +150,22 @@ def _extract_column_name(col: Column) -> str:
     return col
 
 
+def _column_key(col: Any) -> str:
+    # values and conflict columns are often ORM attributes rather than columns
+    return col if isinstance(col, str) else col.key
+
+
 def _visit_upsert(element: Upsert, compiler: Compiled, **kw):
     dialect = compiler.dialect.name
     raise NotImplementedError(f"The dialect '{dialect}' does not support upserts.")
 
 
+# dialect modules are imported when first compiled for, rather than up front
+
+
 def _visit_upsert_postgresql(el: Upsert, compiler: Compiled, **kw):
+    from sqlalchemy.dialects.postgresql import insert as pg_insert  # noqa: PLC0415
+
     stmt = pg_insert(el.table).values(*el.values_args, **el.values_kwargs)
     cols = el.conflict_columns
     updates = {key: stmt.excluded[key] for key in el.update_columns}
@@ -82,13 +174,30 @@ def _visit_upsert_postgresql(el: Upsert, compiler: Compiled, **kw):
 
 
 def _visit_upsert_mysql(el: Upsert, compiler: Compiled, **kw):
+    from sqlalchemy.dialects.mysql import insert as mysql_insert  # noqa: PLC0415
+
     stmt = mysql_insert(el.table).values(*el.values_args, **el.values_kwargs)
     updates = {key: stmt.inserted[key] for key in el.update_columns}
     stmt = stmt.on_duplicate_key_update(**updates)
     return compiler.process(stmt)
 
 
+def _visit_upsert_duckdb(el: Upsert, compiler: Compiled, **kw):
+    from sqlalchemy.dialects.postgresql import insert as pg_insert  # noqa: PLC0415
+
+    stmt = pg_insert(el.table).values(*el.values_args, **el.values_kwargs)
+    cols = el.conflict_columns
+    update_columns = _duckdb_update_columns(el)
+    if not update_columns:
+        return compiler.process(stmt.on_conflict_do_nothing(index_elements=cols))
+    updates = {key: stmt.excluded[key] for key in update_columns}
+    stmt = stmt.on_conflict_do_update(index_elements=cols, set_=updates)
+    return compiler.process(stmt)
+
+
 def _visit_upsert_sqlite(el: Upsert, compiler: Compiled, **kw):
+    from sqlalchemy.dialects.sqlite import insert as sqlite_insert  # noqa: PLC0415
+
     stmt = sqlite_insert(el.table).values(*el.values_args, **el.values_kwargs)
     cols = el.conflict_columns
     updates = {key: stmt.excluded[key] for key in el.update_columns}
@@ -98,5 +207,6 @@ def _visit_upsert_sqlite(el: Upsert, compiler: Compiled, **kw):
 
 compiles(Upsert)(_visit_upsert)
 compiles(Upsert, "postgresql")(_visit_upsert_postgresql)
+compiles(Upsert, "duckdb")(_visit_upsert_duckdb)
 compiles(Upsert, "mysql")(_visit_upsert_mysql)
 compiles(Upsert, "sqlite")(_visit_upsert_sqlite)
@@ -0,0 +1,28 @@
+"""Utilities for the Database Exporter integration."""
+
+import asyncio
+from collections.abc import Callable
+import contextlib
+from typing import Any, TypeVar
+
+from homeassistant.core import HomeAssistant
+
+_R = TypeVar("_R")
+
+
+async def async_run_to_completion(
+    hass: HomeAssistant, target: Callable[..., _R], *args: Any
+) -> _R:
+    """Run a target write in the executor, letting it finish if cancelled.
+
+    Cancelling the awaiting task doesn't stop the executor thread, so a
+    write could otherwise still be using the target after teardown has
+    released it. The cancellation is passed on once the write has finished.
+    """
+    future = hass.async_add_executor_job(target, *args)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        with contextlib.suppress(Exception):
+            await future
+        raise
@@ -0,0 +1,346 @@
+"""Export verification for the Database Exporter integration."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import Row, Select, bindparam, func, select
+
+from homeassistant.components.recorder import get_instance as get_recorder_instance
+
+from .util import async_run_to_completion
+
+if TYPE_CHECKING:
+    from sqlalchemy import ColumnElement
+    from sqlalchemy.orm import InstrumentedAttribute
+
+    from .exporters import Exporter
+    from .throttle import ExportThrottle
+
+_LOGGER = logging.getLogger(__name__)
+
+RANGE_SIZE = 100_000
+LEAF_SIZE = 1_000
+FANOUT = 10
+TS_TOLERANCE = 1e-6
+
+
+@dataclass(slots=True)
+class ChecksumColumns:
+    """ID and timestamp columns compared between the recorder and the target.
+
+    Rows the recorder updates in place, which keeps their ID and timestamp,
+    can also be compared on a numeric value expression.
+    """
+
+    source_id: InstrumentedAttribute[int]
+    source_ts: InstrumentedAttribute[Any]
+    target_id: InstrumentedAttribute[int]
+    target_ts: InstrumentedAttribute[Any]
+    source_value: ColumnElement[Any] | None = None
+    target_value: ColumnElement[Any] | None = None
+
+    @property
+    def source_floats(self) -> list[ColumnElement[Any]]:
+        """Return the recorder columns summed alongside the ID."""
+        return [c for c in (self.source_ts, self.source_value) if c is not None]
+
+    @property
+    def target_floats(self) -> list[ColumnElement[Any]]:
+        """Return the target columns summed alongside the ID."""
+        return [c for c in (self.target_ts, self.target_value) if c is not None]
+
+
+@dataclass(slots=True)
+class VerifyResult:
+    """Outcome of a verification slice."""
+
+    ranges_checked: int = 0
+    rows_repaired: int = 0
+    rows_target_only: int = 0
+    complete: bool = False
+
+
+@dataclass(slots=True)
+class _TargetOnly:
+    """Checksum of the rows of a leaf range that only exist in the target."""
+
+    start: int
+    end: int
+    checksum: tuple[Any, ...]
+
+
+class RangeVerifier:
+    """Verify and repair an exporter's target against the recorder.
+
+    IDs from the oldest recorder row up to the target's watermark are split
+    into fixed ranges. For each range both sides compute a cheap aggregate
+    (row count, sum of IDs, sum of timestamps, and sum of values if the
+    exporter compares them) using only a primary key or unique index range
+    scan. Ranges that differ are split and checked again,
+    Merkle-style, until they are small enough to compare row by row; only the
+    missing or mismatched rows found there are exported again.
+
+    Ranges are aligned to multiples of their size, so the same ID always
+    falls in the same ranges. Rows the recorder has since purged are kept in
+    the target; they are reported when a leaf range is compared row by row,
+    and their checksum is then added to the recorder's checksum of every
+    range containing that leaf, so purged ranges only need to be walked once.
+
+    Verification resumes where the previous slice stopped, and the throttle
+    is waited on between ranges, so it can run in small slices without
+    holding up the recorder.
+    """
+
+    def __init__(self, exporter: Exporter[Any], columns: ChecksumColumns) -> None:
+        """Initialize the verifier."""
+        self.exporter = exporter
+        self.columns = columns
+        self.cursor: int | None = None
+        # leaf index -> checksum of rows in that leaf only found in the target
+        self._target_only: dict[int, _TargetOnly] = {}
+
+    async def async_verify(
+        self, throttle: ExportThrottle, time_budget: float
+    ) -> VerifyResult:
+        """Verify ranges until done or the time budget is used up."""
+        deadline = time.monotonic() + time_budget
+        hass = self.exporter.hass
+        hass_exec = hass.async_add_executor_job
+        rec_exec = get_recorder_instance(hass).async_add_executor_job
+
+        first_id = await rec_exec(self._get_first_source_id)
+        last_id = await hass_exec(self.exporter._get_latest_exported_id)  # noqa: SLF001
+        result = VerifyResult()
+        if first_id is None or last_id is None:
+            result.complete = True
+            return result
+
+        # at least one range is checked, so every slice makes progress
+        cursor = max(self.cursor or first_id, first_id)
+        while cursor <= last_id:
+            end = min(_next_boundary(cursor, RANGE_SIZE), last_id + 1)
+            await self._async_verify_range(cursor, end, RANGE_SIZE, result)
+            result.ranges_checked += 1
+            cursor = end
+            if time.monotonic() >= deadline:
+                break
+            await throttle.async_wait(0)
+
+        result.complete = cursor > last_id
+        self.cursor = None if result.complete else cursor
+        return result
+
+    async def _async_verify_range(
+        self, start: int, end: int, size: int, result: VerifyResult
+    ) -> None:
+        hass_exec = self.exporter.hass.async_add_executor_job
+        rec_exec = get_recorder_instance(self.exporter.hass).async_add_executor_job
+
+        source, target = await asyncio.gather(
+            rec_exec(self._get_source_checksum, start, end),
+            hass_exec(self._get_target_checksum, start, end),
+        )
+        source = self._add_target_only(start, end, source)
+        if _checksums_match(source, target):
+            return
+
+        _LOGGER.debug("Range [%d, %d) differs: %s != %s", start, end, source, target)
+        if size <= LEAF_SIZE:
+            await self._async_repair_range(start, end, result)
+            return
+
+        size //= FANOUT
+        sub_start = start
+        while sub_start < end:
+            sub_end = min(_next_boundary(sub_start, size), end)
+            await self._async_verify_range(sub_start, sub_end, size, result)
+            sub_start = sub_end
+
+    async def _async_repair_range(
+        self, start: int, end: int, result: VerifyResult
+    ) -> None:
+        exporter = self.exporter
+        hass_exec = exporter.hass.async_add_executor_job
+        rec_exec = get_recorder_instance(exporter.hass).async_add_executor_job
+
+        source, target = await asyncio.gather(
+            rec_exec(self._get_source_rows, start, end),
+            hass_exec(self._get_target_rows, start, end),
+        )
+        exported = {row[0]: row[1:] for row in target}
+        recorded = {row[0] for row in source}
+        repair_ids = {
+            row_id
+            for row_id, *values in source
+            if row_id not in exported
+            or any(
+                abs(value - exported_value) > TS_TOLERANCE
+                for value, exported_value in zip(values, exported[row_id], strict=True)
+            )
+        }
+        target_only = [row for row in target if row[0] not in recorded]
+        self._remember_target_only(start, end, target_only)
+        if target_only:
+            _LOGGER.debug(
+                "Ignoring %d rows in range [%d, %d) that were purged from the recorder",
+                len(target_only),
+                start,
+                end,
+            )
+            result.rows_target_only += len(target_only)
+        if not repair_ids:
+            return
+
+        # start is inclusive, while recorder entries are read after an ID
+        entries = await rec_exec(
+            exporter._get_recorder_entries,  # noqa: SLF001
+            start - 1,
+            end - start,
+        )
+        entries = [e for e in entries if exporter._entry_id(e) in repair_ids]  # noqa: SLF001
+        await async_run_to_completion(
+            exporter.hass,
+            exporter._repair_entries,  # noqa: SLF001
+            entries,
+        )
+        _LOGGER.info("Repaired %d rows in range [%d, %d)", len(entries), start, end)
+        result.rows_repaired += len(entries)
+
+    def _add_target_only(
+        self, start: int, end: int, checksum: tuple[Any, ...]
+    ) -> tuple[Any, ...]:
+        for index in range(start // LEAF_SIZE, (end - 1) // LEAF_SIZE + 1):
+            leaf = self._target_only.get(index)
+            if leaf is not None and start <= leaf.start and leaf.end <= end:
+                checksum = tuple(
+                    value + added
+                    for value, added in zip(checksum, leaf.checksum, strict=True)
+                )
+        return checksum
+
+    def _remember_target_only(
+        self, start: int, end: int, rows: list[tuple[Any, ...]]
+    ) -> None:
+        index = start // LEAF_SIZE
+        if not rows:
+            self._target_only.pop(index, None)
+            return
+        ids, *floats = zip(*rows, strict=True)
+        sums: list[Any] = []
+        for column in floats:
+            wholes = [round(value) for value in column]
+            sums += [
+                sum(wholes),
+                math.fsum(v - w for v, w in zip(column, wholes, strict=True)),
+            ]
+        checksum = (len(rows), sum(ids), *sums)
+        self._target_only[index] = _TargetOnly(start, end, checksum)
+
+    def _get_first_source_id(self) -> int | None:
+        stmt = select(func.min(self.columns.source_id))
+        return self._run_source(stmt)[0][0]
+
+    def _get_source_checksum(self, start: int, end: int) -> tuple[Any, ...]:
+        stmt = _checksum_query(self.columns.source_id, self.columns.source_floats)
+        return _normalize(self._run_source(stmt, start=start, end=end)[0])
+
+    def _get_target_checksum(self, start: int, end: int) -> tuple[Any, ...]:
+        stmt = _checksum_query(self.columns.target_id, self.columns.target_floats)
+        return _normalize(self._run_target(stmt, start=start, end=end)[0])
+
+    def _get_source_rows(self, start: int, end: int) -> list[tuple[Any, ...]]:
+        stmt = _rows_query(self.columns.source_id, self.columns.source_floats)
+        rows = self._run_source(stmt, start=start, end=end)
+        return [_normalize_row(row) for row in rows]
+
+    def _get_target_rows(self, start: int, end: int) -> list[tuple[Any, ...]]:
+        stmt = _rows_query(self.columns.target_id, self.columns.target_floats)
+        rows = self._run_target(stmt, start=start, end=end)
+        return [_normalize_row(row) for row in rows]
+
+    def _run_source(self, stmt: Select[Any], **params: int) -> list[Row[Any]]:
+        session = get_recorder_instance(self.exporter.hass).get_session()
+        try:
+            self.exporter._log_statement(stmt, session)  # noqa: SLF001
+            return list(session.execute(stmt, params).all())
+        finally:
+            session.close()
+
+    def _run_target(self, stmt: Select[Any], **params: int) -> list[Row[Any]]:
+        session = self.exporter.export_session
+        try:
+            self.exporter._log_statement(stmt, session)  # noqa: SLF001
+            return list(session.execute(stmt, params).all())
+        finally:
+            session.remove()
+
+
+def _checksum_query(
+    id_column: InstrumentedAttribute[int], float_columns: list[ColumnElement[Any]]
+) -> Select[Any]:
+    # Summing timestamps directly loses precision at their magnitude, and
+    # databases round differently. Whole parts are integers, which sum
+    # exactly, so only the small fractional parts are rounded.
+    sums: list[ColumnElement[Any]] = []
+    for column in float_columns:
+        value = func.coalesce(column, 0)
+        whole = func.round(value)
+        sums += [
+            func.coalesce(func.sum(whole), 0),
+            func.coalesce(func.sum(value - whole), 0),
+        ]
+    return select(func.count(), func.coalesce(func.sum(id_column), 0), *sums).filter(
+        id_column >= bindparam("start"), id_column < bindparam("end")
+    )
+
+
+def _rows_query(
+    id_column: InstrumentedAttribute[int], float_columns: list[ColumnElement[Any]]
+) -> Select[Any]:
+    return select(
+        id_column, *(func.coalesce(column, 0) for column in float_columns)
+    ).filter(id_column >= bindparam("start"), id_column < bindparam("end"))
+
+
+def _normalize(row: Row[Any]) -> tuple[Any, ...]:
+    # databases return sums as integers, floats, or decimals
+    count, ids, *sums = row
+    wholes, fractions = sums[::2], sums[1::2]
+    return (
+        int(count),
+        int(ids),
+        *(
+            value
+            for whole, fraction in zip(wholes, fractions, strict=True)
+            for value in (int(whole), float(fraction))
+        ),
+    )
+
+
+def _normalize_row(row: Row[Any]) -> tuple[Any, ...]:
+    row_id, *values = row
+    return (int(row_id), *(float(value) for value in values))
+
+
+def _next_boundary(value: int, size: int) -> int:
+    return (value // size + 1) * size
+
+
+def _checksums_match(source: tuple[Any, ...], target: tuple[Any, ...]) -> bool:
+    source_count, source_ids, *source_sums = source
+    target_count, target_ids, *target_sums = target
+    if source_count != target_count or source_ids != target_ids:
+        return False
+    # whole parts are exact, so only the rows' own tolerance adds up
+    diffs = [s - t for s, t in zip(source_sums, target_sums, strict=True)]
+    tolerance = source_count * TS_TOLERANCE
+    return all(
+        abs(whole + fraction) <= tolerance
+        for whole, fraction in zip(diffs[::2], diffs[1::2], strict=True)
+    )
@@ -1,10 +1,14 @@
 """Common fixtures for the Database Exporter tests."""
 
 from collections.abc import Generator
+from pathlib import Path
 from unittest.mock import AsyncMock, patch
 
 import pytest
 
+from homeassistant.components.database_exporter.core import _init_session
+from homeassistant.components.database_exporter.types import ScopedSession
+
 from tests.typing import RecorderInstanceContextManager
 
 
@@ -23,3 +27,12 @@ def mock_setup_entry() -> Generator[AsyncMock]:
         return_value=True,
     ) as mock_setup_entry:
         yield mock_setup_entry
+
+
+@pytest.fixture
+def export_session(tmp_path: Path) -> Generator[ScopedSession]:
+    """Return a session for an SQLite export target."""
+    session = _init_session(f"sqlite:///{tmp_path / 'export.db'}")
+    yield session
+    session.remove()
+    session.get_bind().dispose()
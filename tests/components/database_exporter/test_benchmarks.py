@@ -0,0 +1,264 @@
+"""Benchmarks for the Database Exporter integration.
+
+Timings are recorded as test properties, so they can be tracked for
+regressions from the JUnit XML report. Assertions only cover comparisons
+that hold on any machine.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import math
+import multiprocessing
+from pathlib import Path
+import time
+from typing import Any
+from unittest.mock import patch
+
+import orjson
+import pytest
+import sqlalchemy
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from homeassistant.components.database_exporter import parquet
+from homeassistant.components.database_exporter.db_schema import (
+    TABLE_EXPORTED_STATES,
+    ExportedStates,
+)
+from homeassistant.components.database_exporter.migration import migrate_schema
+from homeassistant.components.database_exporter.parquet import (
+    MANIFEST_FILE,
+    open_parquet_target,
+)
+from homeassistant.components.database_exporter.transform import (
+    JSONText,
+    json_serializer,
+)
+from homeassistant.components.database_exporter.upsert import execute_upsert, upsert
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util.json import json_loads, load_json_object
+
+BLOB_COUNT = 20_000
+POOL_WORKERS = (1, 2, 4)
+STATE_COUNT = 20_000
+STATE_BATCH_SIZE = 1000
+EXPORT_RUNS = 24
+
+
+def _attribute_blobs() -> list[str]:
+    return [
+        json_bytes(
+            {
+                "unit_of_measurement": "W",
+                "device_class": "power",
+                "state_class": "measurement",
+                "friendly_name": f"Power {i}",
+                "voltage": 230.0 + i % 7,
+                "phases": [{"id": phase, "current": i / 100} for phase in range(3)],
+            }
+        ).decode()
+        for i in range(BLOB_COUNT)
+    ]
+
+
+def _state_rows(start: int, count: int) -> list[dict[Any, Any]]:
+    return [
+        {
+            ExportedStates.state_id: state_id,
+            ExportedStates.state_value: str(state_id % 100),
+            ExportedStates.last_updated: 1_750_000_000.0 + state_id,
+            ExportedStates.origin_id: 0,
+            ExportedStates.entity_id: (
+                f"{('sensor', 'light')[state_id % 2]}.power_{state_id % 50}"
+            ),
+        }
+        for state_id in range(start, start + count)
+    ]
+
+
+def _upsert_states(rows: list[dict[Any, Any]]) -> Any:
+    return (
+        upsert(ExportedStates)
+        .values(rows)
+        .on_conflict(ExportedStates.state_id)
+        .update(*ExportedStates.__table__.columns)
+    )
+
+
+def _dir_size(path: Path) -> int:
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+
+
+def _best_of(run: Callable[[], object], rounds: int = 3) -> float:
+    best = math.inf
+    for _ in range(rounds):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_json_passthrough(record_property: Callable[[str, object], None]) -> None:
+    """Compare binding recorder JSON as is with decoding and encoding it again."""
+    blobs = _attribute_blobs()
+
+    def _passthrough() -> list[str]:
+        return [json_serializer(JSONText(blob)) for blob in blobs]
+
+    def _reencode() -> list[str]:
+        return [json_serializer(json_loads(blob)) for blob in blobs]
+
+    passthrough_time = _best_of(_passthrough)
+    reencode_time = _best_of(_reencode)
+    record_property("passthrough_time", passthrough_time)
+    record_property("reencode_time", reencode_time)
+
+    def _pool_reencode(executor: ProcessPoolExecutor, chunksize: int) -> list[str]:
+        decoded = executor.map(orjson.loads, blobs, chunksize=chunksize)
+        return [json_serializer(value) for value in decoded]
+
+    # only decoding in a process pool depends on the number of workers
+    expected = [json_loads(value) for value in _passthrough()]
+    for workers in POOL_WORKERS:
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            chunksize = math.ceil(BLOB_COUNT / workers)
+            # start the workers before timing
+            list(executor.map(orjson.loads, blobs[:workers]))
+            run = partial(_pool_reencode, executor, chunksize)
+            record_property(f"pool_reencode_time_{workers}", _best_of(run))
+            assert [json_loads(value) for value in run()] == expected
+
+    assert passthrough_time < reencode_time
+
+
+def test_startup_up_to_date(
+    tmp_path: Path, record_property: Callable[[str, object], None]
+) -> None:
+    """Time connecting to a target whose schema is already up to date."""
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    statements: list[str] = []
+
+    def _record_statement(
+        conn: Any, cursor: Any, statement: str, *args: Any, **kwargs: Any
+    ) -> None:
+        statements.append(statement)
+
+    try:
+        migrate_schema(engine)
+        event.listen(engine, "before_cursor_execute", _record_statement)
+        startup_time = _best_of(lambda: migrate_schema(engine), rounds=5)
+    finally:
+        engine.dispose()
+
+    record_property("startup_time", startup_time)
+    record_property("startup_statements", len(statements) // 5)
+    assert statements
+    assert not [
+        statement
+        for statement in statements
+        if statement.lstrip().upper().startswith(("ALTER", "CREATE", "DROP", "INSERT"))
+    ]
+
+
+@pytest.mark.parametrize("backend", ["sqlite", "duckdb"])
+def test_upsert_states(
+    tmp_path: Path, record_property: Callable[[str, object], None], backend: str
+) -> None:
+    """Time exporting batches of states, then exporting them all again."""
+    if backend == "duckdb":
+        pytest.importorskip("duckdb_engine")
+    engine = sqlalchemy.create_engine(f"{backend}:///{tmp_path / 'export.db'}")
+    batches = [
+        _state_rows(start, STATE_BATCH_SIZE)
+        for start in range(1, STATE_COUNT + 1, STATE_BATCH_SIZE)
+    ]
+
+    def _export(session: Session) -> float:
+        start = time.perf_counter()
+        for batch in batches:
+            execute_upsert(session, _upsert_states(batch))
+            session.commit()
+        return time.perf_counter() - start
+
+    try:
+        migrate_schema(engine)
+        with Session(engine) as session:
+            insert_time = _export(session)
+            update_time = _export(session)
+            count = session.scalar(select(func.count(ExportedStates.state_id)))
+    finally:
+        engine.dispose()
+
+    record_property("insert_time", insert_time)
+    record_property("update_time", update_time)
+    assert count == STATE_COUNT
+
+
+def test_parquet_scan(
+    tmp_path: Path, record_property: Callable[[str, object], None]
+) -> None:
+    """Compare scanning and storing hourly exports as Parquet and in SQLite."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    run_size = STATE_COUNT // EXPORT_RUNS
+    runs = [
+        _state_rows(start, run_size)
+        for start in range(1, run_size * EXPORT_RUNS + 1, run_size)
+    ]
+    columns = ["entity_id", "state_value", "last_updated"]
+
+    def _export_parquet(path: Path) -> list[Path]:
+        target = open_parquet_target(str, f"parquet://{path}")
+        for rows in runs:
+            target.write([_upsert_states(rows)])
+            target.flush()
+        manifest = load_json_object(path / MANIFEST_FILE)
+        segments = manifest["tables"][TABLE_EXPORTED_STATES]["segments"]
+        return [path / segment["path"] for segment in segments]
+
+    def _scan_parquet(paths: list[Path]) -> int:
+        return sum(
+            pq.ParquetFile(path).read(columns=columns).num_rows for path in paths
+        )
+
+    compacted = _export_parquet(tmp_path / "compacted")
+    with patch.object(parquet, "COMPACT_SEGMENTS", math.inf):
+        uncompacted = _export_parquet(tmp_path / "uncompacted")
+
+    engine = sqlalchemy.create_engine(f"sqlite:///{tmp_path / 'export.db'}")
+    stmt = select(
+        ExportedStates.entity_id,
+        ExportedStates.state_value,
+        ExportedStates.last_updated,
+    )
+    try:
+        migrate_schema(engine)
+        with Session(engine) as session:
+            for rows in runs:
+                execute_upsert(session, _upsert_states(rows))
+                session.commit()
+            sqlite_time = _best_of(lambda: session.execute(stmt).all())
+    finally:
+        engine.dispose()
+
+    parquet_time = _best_of(lambda: _scan_parquet(compacted))
+    uncompacted_time = _best_of(lambda: _scan_parquet(uncompacted))
+    parquet_size = _dir_size(tmp_path / "compacted")
+    sqlite_size = (tmp_path / "export.db").stat().st_size
+    record_property("sqlite_scan_time", sqlite_time)
+    record_property("parquet_scan_time", parquet_time)
+    record_property("uncompacted_scan_time", uncompacted_time)
+    record_property("sqlite_size", sqlite_size)
+    record_property("parquet_size", parquet_size)
+    record_property("parquet_segments", len(compacted))
+    record_property("uncompacted_segments", len(uncompacted))
+
+    assert (
+        _scan_parquet(compacted) == _scan_parquet(uncompacted) == len(runs) * run_size
+    )
+    assert len(compacted) < len(uncompacted)
+    assert parquet_size < sqlite_size
@@ -2,14 +2,31 @@
 
 from unittest.mock import AsyncMock, patch
 
-from sqlalchemy.exc import SQLAlchemyError
-
 from homeassistant import config_entries
-from homeassistant.components.database_exporter.const import CONF_DB_URL, DOMAIN
+from homeassistant.components.database_exporter.const import (
+    CONF_DB_URL,
+    CONF_DEDUPLICATE_CONTENT,
+    CONF_DOWNSAMPLE,
+    CONF_EXPORT_ROLLUPS,
+    CONF_MAX_ROWS_PER_SECOND,
+    DOMAIN,
+)
+from homeassistant.components.database_exporter.models import (
+    DatabaseExportManagerError,
+)
 from homeassistant.components.recorder import Recorder
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
 
+from tests.common import MockConfigEntry
+
+OPTIONS = {
+    CONF_EXPORT_ROLLUPS: True,
+    CONF_DEDUPLICATE_CONTENT: True,
+    CONF_DOWNSAMPLE: {"sensor": {"deadband": 0.5}},
+    CONF_MAX_ROWS_PER_SECOND: 1000,
+}
+
 
 async def test_form(
     hass: HomeAssistant, recorder_mock: Recorder, mock_setup_entry: AsyncMock
@@ -22,7 +39,7 @@ async def test_form(
     assert result["errors"] == {}
 
     with patch(
-        "homeassistant.components.database_exporter.config_flow.test_connection",
+        "homeassistant.components.database_exporter.config_flow.init_connection",
         return_value=True,
     ):
         result = await hass.config_entries.flow.async_configure(
@@ -50,8 +67,8 @@ async def test_form_cannot_connect(
     )
 
     with patch(
-        "homeassistant.components.database_exporter.config_flow.test_connection",
-        side_effect=SQLAlchemyError,
+        "homeassistant.components.database_exporter.config_flow.init_connection",
+        side_effect=DatabaseExportManagerError,
     ):
         result = await hass.config_entries.flow.async_configure(
             result["flow_id"],
@@ -68,7 +85,7 @@ async def test_form_cannot_connect(
     # we can show the config flow is able to recover from an error.
 
     with patch(
-        "homeassistant.components.database_exporter.config_flow.test_connection",
+        "homeassistant.components.database_exporter.config_flow.init_connection",
         return_value=True,
     ):
         result = await hass.config_entries.flow.async_configure(
@@ -85,3 +102,49 @@ async def test_form_cannot_connect(
         CONF_DB_URL: "sqlite:///test.db",
     }
     assert len(mock_setup_entry.mock_calls) == 1
+
+
+async def test_options_flow(
+    hass: HomeAssistant, recorder_mock: Recorder, mock_setup_entry: AsyncMock
+) -> None:
+    """Test tuning options are set through the options flow."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={CONF_DB_URL: "sqlite:///test.db"}, minor_version=2
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] is FlowResultType.FORM
+    assert result["step_id"] == "init"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {**OPTIONS, CONF_DOWNSAMPLE: {"sensor": {"deadband": -1}}}
+    )
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {CONF_DOWNSAMPLE: "invalid_downsample"}
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], OPTIONS
+    )
+    assert result["type"] is FlowResultType.CREATE_ENTRY
+    assert entry.data == {CONF_DB_URL: "sqlite:///test.db"}
+    assert entry.options == OPTIONS
+
+
+async def test_migrate_options(
+    hass: HomeAssistant, recorder_mock: Recorder, mock_setup_entry: AsyncMock
+) -> None:
+    """Test tuning options are moved out of the data of older entries."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_DB_URL: "sqlite:///test.db", **OPTIONS},
+        minor_version=1,
+    )
+    entry.add_to_hass(hass)
+
+    await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert entry.minor_version == 2
+    assert entry.data == {CONF_DB_URL: "sqlite:///test.db"}
+    assert entry.options == OPTIONS
@@ -0,0 +1,170 @@
+"""Test storing Database Exporter JSON data by content hash."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from homeassistant.components.database_exporter.content import (
+    ContentCache,
+    content_hash,
+)
+from homeassistant.components.database_exporter.core import DatabaseExportManager
+from homeassistant.components.database_exporter.db_schema import (
+    ExportedContent,
+    ExportedStateAttributes,
+)
+from homeassistant.components.database_exporter.exporters import StateExporter
+from homeassistant.components.database_exporter.reader import RecorderReader
+from homeassistant.components.database_exporter.types import ScopedSession
+from homeassistant.components.recorder.db_schema import (
+    StateAttributes,
+    States,
+    StatesMeta,
+)
+from homeassistant.core import HomeAssistant
+
+ATTRS = '{"unit_of_measurement":"W"}'
+OTHER_ATTRS = '{"unit_of_measurement":"kW"}'
+
+
+def _states(start_id: int, attrs: list[str]) -> list[States]:
+    return [
+        States(
+            state_id=state_id,
+            state="1",
+            last_updated_ts=1_750_000_000.0 + state_id,
+            origin_idx=0,
+            attributes_id=state_id,
+            state_attributes=StateAttributes(attributes_id=state_id, shared_attrs=blob),
+            states_meta_rel=StatesMeta(entity_id="sensor.power"),
+        )
+        for state_id, blob in enumerate(attrs, start_id)
+    ]
+
+
+def _get_attributes(session: ScopedSession) -> dict[int, tuple]:
+    rows = session.execute(
+        select(
+            ExportedStateAttributes.attributes_id,
+            ExportedStateAttributes.content_hash,
+            ExportedStateAttributes.value,
+        )
+    ).all()
+    session.remove()
+    return {row_id: (blob_hash, value) for row_id, blob_hash, value in rows}
+
+
+def _get_content(session: ScopedSession) -> dict[str, dict]:
+    rows = session.execute(
+        select(ExportedContent.content_hash, ExportedContent.value)
+    ).all()
+    session.remove()
+    return dict(rows)
+
+
+def test_content_cache_evicts_least_recent() -> None:
+    """Test the cache evicts the least recently used hashes."""
+    cache = ContentCache(max_size=2)
+    cache.add_all(["a", "b"])
+    assert "a" in cache  # now more recent than "b"
+    cache.add_all(["c"])
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_export_inline(export_session: ScopedSession) -> None:
+    """Test attributes are stored inline without a content cache."""
+    exporter = StateExporter(export_session, Mock(), Mock(), rollups=False)
+    exporter._export_entries(_states(1, [ATTRS, ATTRS]))
+
+    assert _get_attributes(export_session) == {
+        1: (None, {"unit_of_measurement": "W"}),
+        2: (None, {"unit_of_measurement": "W"}),
+    }
+    assert _get_content(export_session) == {}
+
+
+def test_export_by_hash(export_session: ScopedSession) -> None:
+    """Test identical attributes are stored once and mapped by hash."""
+    cache = ContentCache()
+    exporter = StateExporter(
+        export_session, Mock(), Mock(), rollups=False, content_cache=cache
+    )
+    exporter._export_entries(_states(1, [ATTRS, OTHER_ATTRS, ATTRS]))
+
+    attrs_hash, other_hash = content_hash(ATTRS), content_hash(OTHER_ATTRS)
+    assert _get_attributes(export_session) == {
+        1: (attrs_hash, None),
+        2: (other_hash, None),
+        3: (attrs_hash, None),
+    }
+    assert _get_content(export_session) == {
+        attrs_hash: {"unit_of_measurement": "W"},
+        other_hash: {"unit_of_measurement": "kW"},
+    }
+    assert attrs_hash in cache
+    assert other_hash in cache
+
+    # content known to be stored isn't sent again
+    content_stmt, mapping_stmt = exporter._export_state_attributes_queries(
+        _states(4, [ATTRS])
+    )
+    assert content_stmt is None
+    assert mapping_stmt is not None
+
+
+def test_cache_filled_after_commit(export_session: ScopedSession) -> None:
+    """Test hashes of a failed batch are not cached, and sent again on retry."""
+    cache = ContentCache()
+    exporter = StateExporter(
+        export_session, Mock(), Mock(), rollups=False, content_cache=cache
+    )
+    states = _states(1, [ATTRS])
+    with (
+        patch.object(
+            export_session,
+            "commit",
+            side_effect=OperationalError("COMMIT", {}, Exception("disk full")),
+        ),
+        pytest.raises(OperationalError),
+    ):
+        exporter._export_entries(states)
+
+    assert content_hash(ATTRS) not in cache
+    assert _get_content(export_session) == {}
+
+    exporter._export_entries(states)
+    assert content_hash(ATTRS) in cache
+    assert list(_get_content(export_session)) == [content_hash(ATTRS)]
+
+
+@pytest.mark.parametrize("parquet", [False, True], ids=["sqlite", "parquet"])
+async def test_content_cache_targets(
+    hass: HomeAssistant, tmp_path: Path, parquet: bool
+) -> None:
+    """Test deduplication only applies to relational targets."""
+    if parquet:
+        pytest.importorskip("pyarrow.parquet")
+        db_url = f"parquet://{tmp_path / 'export'}"
+    else:
+        db_url = f"sqlite:///{tmp_path / 'export.db'}"
+    manager = DatabaseExportManager(
+        hass, RecorderReader(hass), db_url, deduplicate_content=True
+    )
+    await manager.async_setup()
+    await manager._async_connect()
+
+    caches = {id(exporter.content_cache) for exporter in manager.exporters}
+    if parquet:
+        assert all(exporter.content_cache is None for exporter in manager.exporters)
+    else:
+        # the cache is shared, since all exporters write to the same table
+        assert len(caches) == 1
+        assert isinstance(manager.exporters[0].content_cache, ContentCache)
+    await manager.async_teardown()
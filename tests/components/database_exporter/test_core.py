@@ -0,0 +1,150 @@
+"""Test the Database Exporter export manager."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator
+import threading
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from homeassistant.components.database_exporter.core import DatabaseExportManager
+from homeassistant.components.database_exporter.models import (
+    DatabaseExportManagerError,
+)
+from homeassistant.components.database_exporter.reader import RecorderReader
+from homeassistant.components.database_exporter.util import async_run_to_completion
+from homeassistant.components.database_exporter.verify import VerifyResult
+from homeassistant.core import HomeAssistant
+
+
+@pytest.fixture
+async def manager(hass: HomeAssistant) -> AsyncGenerator[DatabaseExportManager]:
+    """Return a set up export manager."""
+    manager = DatabaseExportManager(hass, RecorderReader(hass), "sqlite://")
+    await manager.async_setup()
+    yield manager
+    await manager.async_teardown()
+
+
+class _BlockingExport:
+    """Stand-in for an export run that waits until released."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self) -> None:
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+
+
+async def test_export_joins_running_export(
+    hass: HomeAssistant, manager: DatabaseExportManager
+) -> None:
+    """Test calls during an export join it and queue a single follow-up run."""
+    export = _BlockingExport()
+    with patch.object(manager, "_async_export", export):
+        first = hass.async_create_task(manager.async_export_data())
+        await export.started.wait()
+        second = hass.async_create_task(manager.async_export_data())
+        third = hass.async_create_task(manager.async_export_data())
+        await asyncio.sleep(0)
+        assert export.calls == 1
+
+        export.release.set()
+        assert await first is True
+        assert await second is False
+        assert await third is False
+
+    assert export.calls == 2
+    assert manager.export_task is None
+    assert manager.export_queued is False
+
+
+async def test_teardown_waits_for_export(
+    hass: HomeAssistant, manager: DatabaseExportManager
+) -> None:
+    """Test teardown cancels a running export and waits for it to stop."""
+    export = _BlockingExport()
+    with patch.object(manager, "_async_export", export):
+        running = hass.async_create_task(manager.async_export_data())
+        await export.started.wait()
+
+        await manager.async_teardown()
+        assert manager.export_task is None
+        with pytest.raises(asyncio.CancelledError):
+            await running
+
+    assert export.calls == 1
+
+
+class _BlockingVerifier:
+    """Stand-in for a verifier whose slice waits until released."""
+
+    columns = SimpleNamespace(
+        target_id=SimpleNamespace(class_=SimpleNamespace(__tablename__="states"))
+    )
+
+    def __init__(self) -> None:
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def async_verify(self, *args: Any) -> VerifyResult:
+        self.started.set()
+        await self.release.wait()
+        return VerifyResult(ranges_checked=1, complete=True)
+
+
+async def test_teardown_waits_for_verify(
+    hass: HomeAssistant, manager: DatabaseExportManager
+) -> None:
+    """Test teardown waits for a running verification before releasing it."""
+    verifier = _BlockingVerifier()
+    manager.verifiers = [verifier]
+    with patch.object(manager, "_async_connect", AsyncMock()):
+        verifying = hass.async_create_task(manager.async_verify_data(1))
+        await verifier.started.wait()
+
+        teardown = hass.async_create_task(manager.async_teardown())
+        await asyncio.sleep(0)
+        assert not teardown.done()
+        assert manager.verifiers == [verifier]
+
+        verifier.release.set()
+        assert await verifying == {
+            "states": VerifyResult(ranges_checked=1, complete=True)
+        }
+        await teardown
+        assert manager.verifiers == []
+
+        with pytest.raises(DatabaseExportManagerError):
+            await manager.async_verify_data(1)
+
+
+async def test_run_to_completion(hass: HomeAssistant) -> None:
+    """Test a cancelled write is only cancelled once it has finished."""
+    started = threading.Event()
+    release = threading.Event()
+    finished: list[bool] = []
+
+    def _write() -> None:
+        started.set()
+        release.wait(5)
+        finished.append(True)
+
+    task = hass.async_create_task(async_run_to_completion(hass, _write))
+    await hass.async_add_executor_job(started.wait, 5)
+    task.cancel()
+    await asyncio.sleep(0)
+    assert not task.done()
+
+    release.set()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert finished == [True]
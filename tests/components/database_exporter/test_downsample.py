@@ -0,0 +1,190 @@
+"""Test the Database Exporter state downsampling."""
+
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import select
+import voluptuous as vol
+
+from homeassistant.components.database_exporter.db_schema import ExportedStates
+from homeassistant.components.database_exporter.downsample import (
+    DOWNSAMPLE_SCHEMA,
+    Downsampler,
+    DownsampleRule,
+    numeric_state,
+)
+from homeassistant.components.database_exporter.exporters import StateExporter
+from homeassistant.components.database_exporter.types import ScopedSession
+from homeassistant.components.recorder.db_schema import States, StatesMeta
+
+START = 1_750_000_000.0
+
+
+def _state(
+    state_id: int,
+    entity_id: str,
+    state: str,
+    updated: float,
+    old_state_id: int | None = None,
+) -> States:
+    return States(
+        state_id=state_id,
+        state=state,
+        last_updated_ts=START + updated,
+        old_state_id=old_state_id,
+        states_meta_rel=StatesMeta(entity_id=entity_id),
+    )
+
+
+def _should_export(rule: DownsampleRule, last: tuple[str, float], state: str) -> bool:
+    last_state, last_updated = last
+    return rule.should_export(
+        (last_state, START + last_updated), _state(2, "sensor.a", state, 60)
+    )
+
+
+@pytest.mark.parametrize(
+    ("rule", "last", "state", "expected"),
+    [
+        # no checks enabled
+        (DownsampleRule(), ("1", 59), "1", True),
+        # absolute deadband
+        (DownsampleRule(deadband=1), ("10", 0), "10.5", False),
+        (DownsampleRule(deadband=1), ("10", 0), "11", False),
+        (DownsampleRule(deadband=1), ("10", 0), "8.9", True),
+        # relative deadband, scaled by the last exported value
+        (DownsampleRule(relative_deadband=0.1), ("100", 0), "109", False),
+        (DownsampleRule(relative_deadband=0.1), ("100", 0), "111", True),
+        (DownsampleRule(deadband=5, relative_deadband=0.01), ("100", 0), "104", False),
+        # non-numeric states count as moved when they change
+        (DownsampleRule(deadband=1), ("on", 0), "on", False),
+        (DownsampleRule(deadband=1), ("on", 0), "off", True),
+        (DownsampleRule(deadband=1), ("10", 0), "unavailable", True),
+        (DownsampleRule(deadband=1), ("unavailable", 0), "10", True),
+        # minimum interval
+        (DownsampleRule(min_interval=30), ("10", 40), "20", False),
+        (DownsampleRule(min_interval=30), ("10", 30), "20", True),
+        (DownsampleRule(deadband=1, min_interval=30), ("10", 0), "10", False),
+        # heartbeat overrides the other checks
+        (DownsampleRule(deadband=1, heartbeat=60), ("10", 0), "10", True),
+        (DownsampleRule(deadband=1, heartbeat=60), ("10", 1), "10", False),
+        (DownsampleRule(min_interval=120, heartbeat=60), ("10", 0), "10", True),
+    ],
+)
+def test_should_export(
+    rule: DownsampleRule, last: tuple[str, float], state: str, expected: bool
+) -> None:
+    """Test when a rule exports a state, given the last exported one."""
+    assert _should_export(rule, last, state) is expected
+
+
+@pytest.mark.parametrize(
+    ("state", "expected"),
+    [
+        ("1.5", 1.5),
+        ("-3", -3.0),
+        ("nan", None),
+        ("inf", None),
+        ("unavailable", None),
+        (None, None),
+    ],
+)
+def test_numeric_state(state: str | None, expected: float | None) -> None:
+    """Test states are only numeric when they are finite numbers."""
+    assert numeric_state(state) == expected
+
+
+def test_schema() -> None:
+    """Test rules are validated and filled with defaults."""
+    assert DOWNSAMPLE_SCHEMA({"sensor": {"deadband": "0.5"}}) == {
+        "sensor": {
+            "deadband": 0.5,
+            "relative_deadband": 0,
+            "min_interval": 0,
+            "heartbeat": 0,
+        }
+    }
+    with pytest.raises(vol.Invalid):
+        DOWNSAMPLE_SCHEMA({"sensor": {"deadband": -1}})
+    with pytest.raises(vol.Invalid):
+        DOWNSAMPLE_SCHEMA({"sensor": {"window": 10}})
+
+
+def test_rule_for() -> None:
+    """Test entity rules are preferred over domain rules."""
+    downsampler = Downsampler(
+        DOWNSAMPLE_SCHEMA({"sensor": {"deadband": 1}, "sensor.b": {"heartbeat": 60}})
+    )
+    assert downsampler.rule_for("sensor.a") == DownsampleRule(deadband=1)
+    assert downsampler.rule_for("sensor.b") == DownsampleRule(heartbeat=60)
+    assert downsampler.rule_for("light.a") is None
+
+
+def test_sample() -> None:
+    """Test states are sampled across batches, with old states relinked."""
+    downsampler = Downsampler(DOWNSAMPLE_SCHEMA({"sensor": {"deadband": 1}}))
+    downsampler.last_exported = {}
+
+    first = [
+        _state(1, "sensor.a", "10", 0, old_state_id=None),
+        _state(2, "sensor.a", "10.5", 10, old_state_id=1),
+        _state(3, "light.a", "on", 10, old_state_id=None),
+        _state(4, "sensor.a", "12", 20, old_state_id=2),
+    ]
+    sampled = downsampler.sample(first)
+    assert [(state.state_id, old) for state, old in sampled] == [
+        (1, None),
+        (3, None),
+        (4, 1),
+    ]
+    assert downsampler.commit() == [first[0], first[2], first[3]]
+    assert downsampler.last_exported == {"sensor.a": (4, "12", START + 20)}
+
+    # decisions for a discarded batch are forgotten
+    second = [_state(5, "sensor.a", "20", 30, old_state_id=4)]
+    assert [state.state_id for state, _ in downsampler.sample(second)] == [5]
+    downsampler.discard()
+    assert downsampler.last_exported == {"sensor.a": (4, "12", START + 20)}
+
+    third = [
+        _state(5, "sensor.a", "20", 30, old_state_id=4),
+        _state(6, "sensor.a", "20.5", 40, old_state_id=5),
+    ]
+    sampled = downsampler.sample(third)
+    assert [(state.state_id, old) for state, old in sampled] == [(5, 4)]
+    downsampler.commit()
+    assert downsampler.last_exported == {"sensor.a": (5, "20", START + 30)}
+
+
+def test_export_downsampled(export_session: ScopedSession) -> None:
+    """Test dropped states aren't exported, but still advance the watermark."""
+    downsampler = Downsampler(DOWNSAMPLE_SCHEMA({"sensor": {"deadband": 1}}))
+    exporter = StateExporter(
+        export_session, Mock(), Mock(), rollups=False, downsampler=downsampler
+    )
+    downsampler.last_exported = exporter._get_last_exported_states()
+    assert downsampler.last_exported == {}
+
+    exporter._export_entries(
+        [
+            _state(1, "sensor.a", "10", 0),
+            _state(2, "sensor.a", "10.5", 10, old_state_id=1),
+            _state(3, "sensor.a", "12", 20, old_state_id=2),
+            _state(4, "sensor.a", "12.5", 30, old_state_id=3),
+        ]
+    )
+
+    stmt = select(ExportedStates.state_id, ExportedStates.old_state_id).order_by(
+        ExportedStates.state_id
+    )
+    rows = export_session.execute(stmt).all()
+    assert [tuple(row) for row in rows] == [(1, None), (3, 1)]
+    assert exporter._get_latest_exported_id() == 4
+
+    # a restarted exporter picks up from the last exported state
+    restarted = Downsampler(DOWNSAMPLE_SCHEMA({"sensor": {"deadband": 1}}))
+    exporter.downsampler = restarted
+    restarted.last_exported = exporter._get_last_exported_states()
+    assert restarted.last_exported == {"sensor.a": (3, "12", START + 20)}
@@ -0,0 +1,135 @@
+"""Test the Database Exporter DuckDB support."""
+
+from __future__ import annotations
+
+from collections.abc import Generator
+from typing import Any
+
+import pytest
+import sqlalchemy
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from homeassistant.components.database_exporter.db_schema import (
+    Base,
+    ExportedStates,
+    ExportedStatisticsMeta,
+)
+from homeassistant.components.database_exporter.migration import migrate_schema
+from homeassistant.components.database_exporter.upsert import (
+    DUCKDB_BULK_ROWS,
+    execute_upsert,
+    upsert,
+)
+
+pytest.importorskip("duckdb_engine")
+
+
+@pytest.fixture
+def session() -> Generator[Session]:
+    """Return a session for an in-memory DuckDB target on a single connection."""
+    engine = sqlalchemy.create_engine("duckdb:///:memory:", poolclass=StaticPool)
+    migrate_schema(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def _states(count: int, state: str) -> list[dict[Any, Any]]:
+    return [
+        {
+            ExportedStates.state_id: state_id,
+            ExportedStates.state_value: state,
+            ExportedStates.last_updated: 1_750_000_000.0 + state_id,
+            ExportedStates.origin_id: 0,
+            ExportedStates.entity_id: f"sensor.power_{state_id % 5}",
+        }
+        for state_id in range(1, count + 1)
+    ]
+
+
+def _upsert_states(session: Session, rows: list[dict[Any, Any]]) -> None:
+    stmt = (
+        upsert(ExportedStates)
+        .values(rows)
+        .on_conflict(ExportedStates.state_id)
+        .update(*ExportedStates.__table__.columns)
+    )
+    execute_upsert(session, stmt)
+    session.commit()
+
+
+def test_schema(session: Session) -> None:
+    """Test only unique indexes are created, and identities use sequences."""
+    indexes = set(session.scalars(text("SELECT index_name FROM duckdb_indexes()")))
+    assert indexes == {
+        index.name
+        for table in Base.metadata.sorted_tables
+        for index in table.indexes
+        if index.unique
+    }
+    foreign_keys = text(
+        "SELECT count(*) FROM duckdb_constraints() "
+        "WHERE constraint_type = 'FOREIGN KEY'"
+    )
+    assert session.scalar(foreign_keys) == 0
+
+    _upsert_states(session, _states(3, "on"))
+    ids = session.scalars(select(ExportedStates.id)).all()
+    assert len(set(ids)) == 3
+    assert None not in ids
+
+
+def _upsert_statistics_meta(session: Session, statistic_id: str) -> None:
+    stmt = (
+        upsert(ExportedStatisticsMeta)
+        .values(
+            [
+                {
+                    ExportedStatisticsMeta.metadata_id: 1,
+                    ExportedStatisticsMeta.statistic_id: statistic_id,
+                    ExportedStatisticsMeta.source: "recorder",
+                }
+            ]
+        )
+        .on_conflict(ExportedStatisticsMeta.metadata_id)
+        .update(*ExportedStatisticsMeta.__table__.columns)
+    )
+    execute_upsert(session, stmt)
+    session.commit()
+
+
+def test_upsert_updates_indexed_columns(session: Session) -> None:
+    """Test upserts update columns that are only indexed on other databases."""
+    _upsert_statistics_meta(session, "sensor.old_name")
+    _upsert_statistics_meta(session, "sensor.new_name")
+
+    assert session.scalars(select(ExportedStatisticsMeta.statistic_id)).all() == [
+        "sensor.new_name"
+    ]
+
+
+@pytest.mark.parametrize("count", [DUCKDB_BULK_ROWS - 1, DUCKDB_BULK_ROWS * 2])
+def test_upsert_round_trip(session: Session, count: int) -> None:
+    """Test rows are inserted and updated through the compiled and bulk paths."""
+    if count >= DUCKDB_BULK_ROWS:
+        pytest.importorskip("pyarrow")
+
+    _upsert_states(session, _states(count, "on"))
+    _upsert_states(session, _states(count, "off"))
+
+    stmt = select(
+        func.count(),
+        func.count(func.distinct(ExportedStates.id)),
+        func.min(ExportedStates.state_value),
+        func.max(ExportedStates.state_value),
+        func.max(ExportedStates.last_updated),
+    )
+    assert tuple(session.execute(stmt).one()) == (
+        count,
+        count,
+        "off",
+        "off",
+        1_750_000_000.0 + count,
+    )
@@ -0,0 +1,196 @@
+"""Test the Database Exporter Parquet export target."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import select
+
+from homeassistant.components.database_exporter import parquet
+from homeassistant.components.database_exporter.db_schema import (
+    TABLE_EXPORTED_STATES,
+    ExportedStates,
+)
+from homeassistant.components.database_exporter.models import (
+    DatabaseExportManagerError,
+)
+from homeassistant.components.database_exporter.parquet import (
+    MANIFEST_FILE,
+    ParquetExportTarget,
+    check_parquet_target,
+    open_parquet_target,
+)
+from homeassistant.components.database_exporter.upsert import Upsert, upsert
+from homeassistant.util.json import load_json_object
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+# 2025-06-15 12:00:00 UTC
+START = 1_749_988_800.0
+LATEST_STATE_ID = (
+    select(ExportedStates.state_id).order_by(ExportedStates.state_id.desc()).limit(1)
+)
+
+
+def _states(ids: range, state: str = "on") -> Upsert:
+    return (
+        upsert(ExportedStates)
+        .values(
+            [
+                {
+                    ExportedStates.state_id: state_id,
+                    ExportedStates.state_value: state,
+                    ExportedStates.last_updated: START + state_id,
+                    ExportedStates.origin_id: 0,
+                    ExportedStates.entity_id: (
+                        "sensor.power" if state_id % 2 else "light.kitchen"
+                    ),
+                }
+                for state_id in ids
+            ]
+        )
+        .on_conflict(ExportedStates.state_id)
+        .update(*ExportedStates.__table__.columns)
+    )
+
+
+def _open(path: Path) -> ParquetExportTarget:
+    return open_parquet_target(str, f"parquet://{path / 'export'}")
+
+
+def _manifest(path: Path) -> dict[str, Any]:
+    return load_json_object(path / "export" / MANIFEST_FILE)
+
+
+def _read_states(path: Path) -> list[dict[str, Any]]:
+    segments = _manifest(path)["tables"][TABLE_EXPORTED_STATES]["segments"]
+    rows = [
+        row
+        for segment in segments
+        for row in pq.ParquetFile(path / "export" / segment["path"]).read().to_pylist()
+    ]
+    return sorted(rows, key=lambda row: row["state_id"])
+
+
+def test_flush_commits_segments(tmp_path: Path) -> None:
+    """Test flushed rows are partitioned and committed to the manifest."""
+    target = _open(tmp_path)
+    target.write([_states(range(1, 5)), None])
+    assert not (tmp_path / "export" / MANIFEST_FILE).exists()
+
+    target.flush()
+    table = _manifest(tmp_path)["tables"][TABLE_EXPORTED_STATES]
+    assert table["key"] == "state_id"
+    assert table["watermark"] == 4
+    assert sorted(segment["path"].split("/")[2] for segment in table["segments"]) == [
+        "domain=light",
+        "domain=sensor",
+    ]
+    assert all(
+        segment["path"].startswith(f"{TABLE_EXPORTED_STATES}/date=2025-06-15/")
+        for segment in table["segments"]
+    )
+    rows = _read_states(tmp_path)
+    assert [row["state_id"] for row in rows] == [1, 2, 3, 4]
+    assert "id" not in rows[0]
+
+
+def test_watermark_resumes(tmp_path: Path) -> None:
+    """Test a reopened target resumes from the committed watermark."""
+    target = _open(tmp_path)
+    assert target.latest_exported_id(LATEST_STATE_ID) is None
+    target.write([_states(range(1, 5))])
+    assert target.latest_exported_id(LATEST_STATE_ID) == 4
+    target.flush()
+
+    # unflushed rows are lost when the target is reopened
+    target.write([_states(range(5, 9))])
+    reopened = _open(tmp_path)
+    assert reopened.latest_exported_id(LATEST_STATE_ID) == 4
+
+
+def test_failed_flush_discards(tmp_path: Path) -> None:
+    """Test a failed flush drops its rows and keeps the committed manifest."""
+    target = _open(tmp_path)
+    target.write([_states(range(1, 5))])
+    target.flush()
+    committed = _manifest(tmp_path)
+
+    target.write([_states(range(5, 9))])
+    with (
+        patch.object(parquet, "save_json", side_effect=OSError("disk full")),
+        pytest.raises(DatabaseExportManagerError),
+    ):
+        target.flush()
+
+    assert target.latest_exported_id(LATEST_STATE_ID) == 4
+    assert _manifest(tmp_path) == committed
+    # nothing is left to flush, and the written segments were never committed
+    target.flush()
+    assert _manifest(tmp_path) == committed
+    assert len(list((tmp_path / "export").rglob("*.parquet"))) == 4
+
+    _open(tmp_path)
+    assert len(list((tmp_path / "export").rglob("*.parquet"))) == 2
+    assert [row["state_id"] for row in _read_states(tmp_path)] == [1, 2, 3, 4]
+
+
+def test_open_removes_uncommitted(tmp_path: Path) -> None:
+    """Test opening the target removes segments missing from the manifest."""
+    target = _open(tmp_path)
+    target.write([_states(range(1, 5))])
+    target.flush()
+    stray = tmp_path / "export" / TABLE_EXPORTED_STATES / "part-stray.parquet"
+    stray.write_bytes(b"PAR1")
+    other = tmp_path / "export" / "notes.txt"
+    other.write_text("kept")
+
+    _open(tmp_path)
+    assert not stray.exists()
+    assert other.exists()
+    assert [row["state_id"] for row in _read_states(tmp_path)] == [1, 2, 3, 4]
+
+
+def test_check_parquet_target(tmp_path: Path) -> None:
+    """Test checking a target creates it, without touching existing segments."""
+    path = tmp_path / "export"
+    path.mkdir()
+    stray = path / "part-stray.parquet"
+    stray.write_bytes(b"PAR1")
+
+    check_parquet_target(str, f"parquet://{path / 'nested'}")
+    assert (path / "nested").is_dir()
+    check_parquet_target(str, f"parquet://{path}")
+    assert stray.exists()
+
+    with pytest.raises(DatabaseExportManagerError):
+        check_parquet_target(str, f"parquet://{stray}")
+
+
+def test_flush_compacts_partitions(tmp_path: Path) -> None:
+    """Test small segments of a partition are merged, keeping the latest rows."""
+    target = _open(tmp_path)
+    with patch.object(parquet, "COMPACT_SEGMENTS", 3):
+        for run in range(3):
+            # every run also updates the rows of the previous one
+            target.write([_states(range(run * 10 + 1, (run + 1) * 10 + 1), "off")])
+            if run:
+                target.write([_states(range((run - 1) * 10 + 1, run * 10 + 1))])
+            target.flush()
+
+    segments = _manifest(tmp_path)["tables"][TABLE_EXPORTED_STATES]["segments"]
+    assert len(segments) == 2
+    assert all("/compact-" in segment["path"] for segment in segments)
+    assert sum(segment["rows"] for segment in segments) == 30
+    files = {
+        file.relative_to(tmp_path / "export").as_posix()
+        for file in (tmp_path / "export").rglob("*.parquet")
+    }
+    assert files == {segment["path"] for segment in segments}
+
+    rows = _read_states(tmp_path)
+    assert [row["state_id"] for row in rows] == list(range(1, 31))
+    assert [row["state_value"] for row in rows] == ["on"] * 20 + ["off"] * 10
@@ -0,0 +1,132 @@
+"""Test the Database Exporter shared recorder reader."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+
+from homeassistant.components.database_exporter.const import (
+    CONF_DB_URL,
+    DATA_RECORDER_READER,
+    DOMAIN,
+)
+from homeassistant.components.database_exporter.reader import (
+    PAGE_TTL,
+    RecorderReader,
+)
+from homeassistant.components.recorder import Recorder
+from homeassistant.core import HomeAssistant
+
+from tests.common import MockConfigEntry
+
+
+class _FakeExporter:
+    """Exporter reading consecutive IDs as entries, once released."""
+
+    def __init__(self) -> None:
+        self.reads: list[tuple[float, int]] = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def _get_recorder_entries(self, start_id: float, limit: int) -> list[int]:
+        self.reads.append((start_id, limit))
+        self.release.wait(5)
+        return list(range(int(start_id) + 1, int(start_id) + limit + 1))
+
+    def _entry_id(self, entry: int) -> int:
+        return entry
+
+
+async def test_concurrent_reads_are_joined(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test a read of a page already being read joins that read."""
+    reader = RecorderReader(hass)
+    exporter = _FakeExporter()
+    exporter.release.clear()
+
+    first = hass.async_create_task(reader.async_get_entries(exporter, 0, 10))
+    second = hass.async_create_task(reader.async_get_entries(exporter, 0, 10))
+    exporter.release.set()
+
+    assert await first == list(range(1, 11))
+    assert await second == list(range(1, 11))
+    assert exporter.reads == [(0, 10)]
+
+
+async def test_cancelled_requester(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test cancelling the requester that started a read doesn't abort it."""
+    reader = RecorderReader(hass)
+    exporter = _FakeExporter()
+    exporter.release.clear()
+
+    first = hass.async_create_task(reader.async_get_entries(exporter, 0, 10))
+    await asyncio.sleep(0)
+    second = hass.async_create_task(reader.async_get_entries(exporter, 0, 10))
+    await asyncio.sleep(0)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    exporter.release.set()
+    assert await second == list(range(1, 11))
+    assert exporter.reads == [(0, 10)]
+    assert not reader._pending
+
+
+async def test_cached_pages(hass: HomeAssistant, recorder_mock: Recorder) -> None:
+    """Test targets behind a cached page are served the rest of it."""
+    reader = RecorderReader(hass)
+    exporter = _FakeExporter()
+
+    assert await reader.async_get_entries(exporter, 0, 10) == list(range(1, 11))
+    assert await reader.async_get_entries(exporter, 4, 10) == list(range(5, 11))
+    assert exporter.reads == [(0, 10)]
+
+    # targets at the end of the page read past the cache
+    assert await reader.async_get_entries(exporter, 10, 10) == list(range(11, 21))
+    assert exporter.reads == [(0, 10), (10, 10)]
+
+
+async def test_cached_pages_expire(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test pages are read again once they are older than the TTL."""
+    reader = RecorderReader(hass)
+    exporter = _FakeExporter()
+
+    await reader.async_get_entries(exporter, 0, 10)
+    for page in reader._pages[_FakeExporter]:
+        page.read_at -= PAGE_TTL + 1
+
+    assert await reader.async_get_entries(exporter, 4, 10) == list(range(5, 15))
+    assert exporter.reads == [(0, 10), (4, 10)]
+
+
+async def test_unload_clears_cache(
+    hass: HomeAssistant, recorder_mock: Recorder
+) -> None:
+    """Test cached pages are dropped once no entries are loaded."""
+    entries = [
+        MockConfigEntry(
+            domain=DOMAIN, data={CONF_DB_URL: f"sqlite:///{name}.db"}, minor_version=2
+        )
+        for name in ("first", "second")
+    ]
+    for entry in entries:
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    reader = hass.data[DATA_RECORDER_READER]
+    await reader.async_get_entries(_FakeExporter(), 0, 10)
+
+    assert await hass.config_entries.async_unload(entries[0].entry_id)
+    assert reader._pages
+
+    assert await hass.config_entries.async_unload(entries[1].entry_id)
+    assert not reader._pages
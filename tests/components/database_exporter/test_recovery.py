@@ -0,0 +1,233 @@
+"""Test how the Database Exporter recovers from target faults."""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+import sqlite3
+import time
+import tracemalloc
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+import sqlalchemy
+from sqlalchemy import event, func, select
+from sqlalchemy.exc import OperationalError
+
+from homeassistant.components.database_exporter import core
+from homeassistant.components.database_exporter.core import DatabaseExportManager
+from homeassistant.components.database_exporter.db_schema import (
+    TABLE_EXPORTED_EVENTS,
+    TABLE_EXPORTED_STATES,
+    ExportedStates,
+)
+from homeassistant.components.database_exporter.exporters import (
+    Exporter,
+    StateExporter,
+    base,
+)
+from homeassistant.components.database_exporter.models import (
+    DatabaseExportManagerError,
+)
+from homeassistant.components.database_exporter.reader import RecorderReader
+from homeassistant.components.database_exporter.upsert import Upsert, execute_upsert
+from homeassistant.components.recorder import Recorder, get_instance
+from homeassistant.components.recorder.db_schema import States
+from homeassistant.core import HomeAssistant
+
+from tests.components.recorder.common import async_wait_recording_done
+
+BATCH_SIZE = 1000
+ENTITY_COUNT = 5
+STATE_COUNT = 2500
+# how long catching up may take on top of any stalls
+CATCH_UP_BUDGET = 10.0
+
+# tables whose rows are only expected to be written again after a failed batch
+_KEYED_TABLES = {TABLE_EXPORTED_EVENTS, TABLE_EXPORTED_STATES}
+
+
+@dataclass
+class FaultScript:
+    """Fail or stall target statements that insert into a table.
+
+    `fail_on` and `stall_on` hold the 1-based occurrences of such inserts
+    to fault on; other statements pass through untouched. With `disconnect`,
+    a failing insert closes the underlying database connection instead of
+    raising, so it fails the way a dropped connection does.
+    """
+
+    table: str
+    fail_on: set[int] = field(default_factory=set)
+    stall_on: set[int] = field(default_factory=set)
+    error: str = "database or disk is full"
+    disconnect: bool = False
+    stall: float = 0.5
+    inserts: int = 0
+    connects: int = 0
+
+    def attach(self, engine: sqlalchemy.Engine) -> None:
+        """Inject faults into statements executed on the engine."""
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "connect", self._connect)
+
+    def _connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+        self.connects += 1
+
+    def _before_cursor_execute(
+        self,
+        conn: sqlalchemy.Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        if not statement.startswith(f"INSERT INTO {self.table} "):
+            return
+        self.inserts += 1
+        if self.inserts in self.stall_on:
+            time.sleep(self.stall)
+        if self.inserts not in self.fail_on:
+            return
+        if self.disconnect:
+            conn.connection.dbapi_connection.close()
+        else:
+            raise OperationalError(
+                statement,
+                parameters,
+                sqlite3.OperationalError(self.error),
+            )
+
+
+@dataclass
+class RecoveryMetrics:
+    """What it cost to get the target caught up again."""
+
+    failed_exports: int = 0
+    rows_read: int = 0
+    rows_written: Counter[tuple[str, Any]] = field(default_factory=Counter)
+    catch_up_time: float = 0.0
+    peak_memory: int = 0
+
+    @property
+    def duplicate_rows(self) -> int:
+        """Rows of keyed tables written more than once."""
+        return sum(
+            count - 1
+            for (table, _), count in self.rows_written.items()
+            if table in _KEYED_TABLES
+        )
+
+
+SCENARIOS = {
+    "disk_full": FaultScript(TABLE_EXPORTED_STATES, fail_on={2}),
+    "dropped_connection": FaultScript(
+        TABLE_EXPORTED_STATES, fail_on={3}, disconnect=True
+    ),
+    "stalled_target": FaultScript(TABLE_EXPORTED_STATES, stall_on={1, 2, 3}),
+}
+
+
+@pytest.mark.parametrize("scenario", list(SCENARIOS))
+async def test_recovery(
+    hass: HomeAssistant,
+    recorder_mock: Recorder,
+    tmp_path: Path,
+    record_property: Callable[[str, object], None],
+    scenario: str,
+) -> None:
+    """Test exports catch up after a fault without re-exporting everything.
+
+    Recovery metrics are recorded as test properties, so they can be tracked
+    for regressions from the JUnit XML report.
+    """
+    script = replace(SCENARIOS[scenario], inserts=0)
+    metrics = RecoveryMetrics()
+
+    for i in range(STATE_COUNT):
+        hass.states.async_set(f"sensor.power_{i % ENTITY_COUNT}", str(i))
+    await async_wait_recording_done(hass)
+
+    init_session = core._init_session
+
+    def _init_faulty_session(db_url: str) -> Any:
+        session = init_session(db_url)
+        script.attach(session.get_bind())
+        return session
+
+    get_recorder_entries = Exporter._get_recorder_entries
+
+    def _count_recorder_entries(self: Exporter, start_id: float, limit: int) -> Any:
+        entries = get_recorder_entries(self, start_id, limit)
+        if isinstance(self, StateExporter):
+            metrics.rows_read += len(entries)
+        return entries
+
+    def _count_upsert(session: Any, stmt: Upsert) -> None:
+        key = stmt.conflict_key
+        metrics.rows_written.update((stmt.target.name, row[key]) for row in stmt.rows())
+        execute_upsert(session, stmt)
+
+    db_url = f"sqlite:///{tmp_path / 'export.db'}"
+    manager = DatabaseExportManager(hass, RecorderReader(hass), db_url)
+    await manager.async_setup()
+
+    tracemalloc.start()
+    try:
+        with (
+            patch.object(core, "_init_session", _init_faulty_session),
+            patch.object(Exporter, "_get_recorder_entries", _count_recorder_entries),
+            patch.object(base, "execute_upsert", _count_upsert),
+        ):
+            start = time.monotonic()
+            try:
+                await manager.async_export_data()
+            except DatabaseExportManagerError:
+                metrics.failed_exports += 1
+            await manager.async_export_data()
+            metrics.catch_up_time = time.monotonic() - start
+        metrics.peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        await manager.async_teardown()
+
+    for name in ("failed_exports", "rows_read", "catch_up_time", "peak_memory"):
+        record_property(name, getattr(metrics, name))
+    record_property("duplicate_rows", metrics.duplicate_rows)
+    record_property("reconnects", script.connects)
+
+    def _count_recorder_states() -> int:
+        session = get_instance(hass).get_session()
+        try:
+            return session.execute(select(func.count(States.state_id))).scalar()
+        finally:
+            session.close()
+
+    def _count_exported_states() -> int:
+        engine = sqlalchemy.create_engine(db_url)
+        try:
+            with engine.connect() as conn:
+                stmt = select(func.count(ExportedStates.state_id))
+                return conn.execute(stmt).scalar()
+        finally:
+            engine.dispose()
+
+    recorded = await get_instance(hass).async_add_executor_job(_count_recorder_states)
+    exported = await hass.async_add_executor_job(_count_exported_states)
+    assert exported == recorded
+
+    assert metrics.failed_exports == (1 if script.fail_on else 0)
+    # only the failed batch is written again, and it is read from the cache
+    assert metrics.duplicate_rows == sum(
+        min(BATCH_SIZE, recorded - (n - 1) * BATCH_SIZE) for n in script.fail_on
+    )
+    assert metrics.rows_read == recorded
+    # the pooled connection is only replaced after it was dropped
+    assert script.connects == (1 if script.disconnect else 0)
+
+    stalled = len(script.stall_on) * script.stall
+    assert stalled <= metrics.catch_up_time < stalled + CATCH_UP_BUDGET
@@ -0,0 +1,327 @@
+"""Test the Database Exporter state exporter."""
+
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import Mock, patch
+
+import pytest
+from sqlalchemy import select, update
+
+from homeassistant.components.database_exporter.db_schema import (
+    ExportedStates,
+    ExportedStatesHourly,
+)
+from homeassistant.components.database_exporter.exporters import StateExporter
+from homeassistant.components.database_exporter.exporters.states import (
+    ROLLUP_PERIOD,
+    _HourlyRollup,
+)
+from homeassistant.components.database_exporter.reader import RecorderReader
+from homeassistant.components.database_exporter.throttle import ExportThrottle
+from homeassistant.components.database_exporter.types import ScopedSession
+from homeassistant.components.database_exporter.upsert import execute_upsert
+from homeassistant.components.recorder import Recorder, get_instance
+from homeassistant.components.recorder.db_schema import States, StatesMeta
+from homeassistant.core import HomeAssistant
+
+from tests.components.recorder.common import async_wait_recording_done
+
+HOUR = 1_750_000_000 - 1_750_000_000 % ROLLUP_PERIOD
+
+
+def _state(entity_id: str, state: str, updated: float) -> States:
+    return States(
+        state=state,
+        last_updated_ts=updated,
+        states_meta_rel=StatesMeta(entity_id=entity_id),
+    )
+
+
+@pytest.fixture
+def exporter(export_session: ScopedSession) -> StateExporter:
+    """Return a state exporter with rollups enabled."""
+    return StateExporter(export_session, Mock(), Mock(), rollups=True)
+
+
+def _export_rollups(exporter: StateExporter, states: list[States]) -> None:
+    stmt = exporter._export_state_rollups_query(states)
+    assert stmt is not None
+    session = exporter.export_session
+    execute_upsert(session, stmt)
+    session.commit()
+
+
+def _get_rollups(session: ScopedSession) -> dict[tuple[str, float], tuple]:
+    rows = session.scalars(select(ExportedStatesHourly)).all()
+    return {
+        (row.entity_id, row.start_ts): (
+            row.min,
+            row.max,
+            row.mean,
+            row.sum,
+            row.count,
+            row.last_value,
+            row.last_updated,
+        )
+        for row in rows
+    }
+
+
+def test_hourly_rollup_add() -> None:
+    """Test values are aggregated, keeping the most recently updated value."""
+    rollup = _HourlyRollup(2.0, 2.0, 2.0, 1, 2.0, HOUR + 20)
+    rollup.add(5.0, HOUR + 10)
+    rollup.add(-1.0, HOUR + 30)
+    rollup.add(3.0, HOUR + 25)
+
+    assert rollup == _HourlyRollup(-1.0, 5.0, 9.0, 4, -1.0, HOUR + 30)
+
+
+def test_hourly_rollup_merge() -> None:
+    """Test an exported aggregate only replaces the last value if it is newer."""
+    rollup = _HourlyRollup(2.0, 4.0, 6.0, 2, 4.0, HOUR + 20)
+    rollup.merge(
+        ExportedStatesHourly(
+            min=1.0, max=3.0, sum=4.0, count=2, last_value=1.0, last_updated=HOUR + 10
+        )
+    )
+    assert rollup == _HourlyRollup(1.0, 4.0, 10.0, 4, 4.0, HOUR + 20)
+
+    rollup.merge(
+        ExportedStatesHourly(
+            min=5.0, max=8.0, sum=13.0, count=2, last_value=8.0, last_updated=HOUR + 40
+        )
+    )
+    assert rollup == _HourlyRollup(1.0, 8.0, 23.0, 6, 8.0, HOUR + 40)
+
+
+def test_export_rollups(exporter: StateExporter, export_session: ScopedSession) -> None:
+    """Test batches are bucketed by hour and merged with exported buckets."""
+    _export_rollups(
+        exporter,
+        [
+            _state("sensor.a", "1.5", HOUR + 10),
+            _state("sensor.a", "4.5", HOUR + 20),
+            _state("sensor.b", "10", HOUR + 30),
+            _state("sensor.a", "7", HOUR + ROLLUP_PERIOD + 5),
+        ],
+    )
+    assert _get_rollups(export_session) == {
+        ("sensor.a", HOUR): (1.5, 4.5, 3.0, 6.0, 2, 4.5, HOUR + 20),
+        ("sensor.b", HOUR): (10.0, 10.0, 10.0, 10.0, 1, 10.0, HOUR + 30),
+        ("sensor.a", HOUR + ROLLUP_PERIOD): (7.0, 7.0, 7.0, 7.0, 1, 7.0, HOUR + 3605),
+    }
+
+    # a later batch with an older state doesn't replace the last value
+    _export_rollups(
+        exporter,
+        [
+            _state("sensor.a", "0", HOUR + 15),
+            _state("sensor.b", "12", HOUR + 40),
+        ],
+    )
+    assert _get_rollups(export_session) == {
+        ("sensor.a", HOUR): (0.0, 4.5, 2.0, 6.0, 3, 4.5, HOUR + 20),
+        ("sensor.b", HOUR): (10.0, 12.0, 11.0, 22.0, 2, 12.0, HOUR + 40),
+        ("sensor.a", HOUR + ROLLUP_PERIOD): (7.0, 7.0, 7.0, 7.0, 1, 7.0, HOUR + 3605),
+    }
+
+
+def test_export_rollups_skips_non_numeric(
+    exporter: StateExporter, export_session: ScopedSession
+) -> None:
+    """Test states that aren't finite numbers are left out of rollups."""
+    non_numeric = [
+        _state("sensor.a", value, HOUR + i)
+        for i, value in enumerate(("unavailable", "unknown", "nan", "inf", "-inf"))
+    ]
+    assert exporter._export_state_rollups_query(non_numeric) is None
+
+    _export_rollups(exporter, [*non_numeric, _state("sensor.a", "2", HOUR + 10)])
+    assert _get_rollups(export_session) == {
+        ("sensor.a", HOUR): (2.0, 2.0, 2.0, 2.0, 1, 2.0, HOUR + 10),
+    }
+
+
+def test_export_rollups_disabled(export_session: ScopedSession) -> None:
+    """Test no rollups are exported unless enabled."""
+    exporter = StateExporter(export_session, Mock(), Mock(), rollups=False)
+    assert exporter._export_state_rollups_query([_state("sensor.a", "1", HOUR)]) is None
+
+
+async def _async_get_recorded(hass: HomeAssistant) -> dict[str, list[int]]:
+    """Return the recorded state IDs of each entity, oldest first."""
+
+    def _get() -> dict[str, list[int]]:
+        stmt = (
+            select(StatesMeta.entity_id, States.state_id)
+            .join(StatesMeta, States.metadata_id == StatesMeta.metadata_id)
+            .order_by(States.state_id)
+        )
+        session = get_instance(hass).get_session()
+        try:
+            recorded: dict[str, list[int]] = {}
+            for entity_id, state_id in session.execute(stmt):
+                recorded.setdefault(entity_id, []).append(state_id)
+            return recorded
+        finally:
+            session.close()
+
+    return await get_instance(hass).async_add_executor_job(_get)
+
+
+async def _async_report(
+    hass: HomeAssistant, state_ids: list[int], delay: float
+) -> None:
+    """Move `last_reported_ts` of recorded states in place, as the recorder does."""
+
+    def _report() -> None:
+        stmt = (
+            update(States)
+            .filter(States.state_id.in_(state_ids))
+            .values(last_reported_ts=States.last_updated_ts + delay)
+        )
+        session = get_instance(hass).get_session()
+        try:
+            session.execute(stmt)
+            session.commit()
+        finally:
+            session.close()
+
+    await get_instance(hass).async_add_executor_job(_report)
+
+
+async def _async_get_exported(
+    hass: HomeAssistant, session: ScopedSession
+) -> dict[int, tuple[Any, ...]]:
+    def _get() -> dict[int, tuple[Any, ...]]:
+        stmt = select(
+            ExportedStates.state_id,
+            ExportedStates.state_value,
+            ExportedStates.last_updated,
+            ExportedStates.last_reported,
+        )
+        try:
+            return {row[0]: tuple(row[1:]) for row in session.execute(stmt)}
+        finally:
+            session.remove()
+
+    return await hass.async_add_executor_job(_get)
+
+
+@pytest.fixture
+async def recorded_exporter(
+    hass: HomeAssistant, recorder_mock: Recorder, export_session: ScopedSession
+) -> StateExporter:
+    """Return a state exporter that exported two states of each of two entities."""
+    for state in ("1", "2"):
+        hass.states.async_set("sensor.a", state)
+        hass.states.async_set("sensor.b", state)
+    await async_wait_recording_done(hass)
+
+    exporter = StateExporter(export_session, hass, RecorderReader(hass), rollups=False)
+    await exporter.async_export_all(ExportThrottle(hass))
+    return exporter
+
+
+async def test_reconcile_last_reported(
+    hass: HomeAssistant,
+    recorded_exporter: StateExporter,
+    export_session: ScopedSession,
+) -> None:
+    """Test in-place `last_reported_ts` bumps of latest states are copied."""
+    recorded = await _async_get_recorded(hass)
+    (a_old, a_latest), (_, b_latest) = recorded["sensor.a"], recorded["sensor.b"]
+    exported = await _async_get_exported(hass, export_session)
+    assert recorded_exporter.latest_states == {
+        "sensor.a": (a_latest, exported[a_latest][1]),
+        "sensor.b": (b_latest, exported[b_latest][1]),
+    }
+
+    # the recorder only reports the latest state, so older ones aren't checked
+    await _async_report(hass, [a_old, a_latest], 60)
+    await recorded_exporter.async_reconcile_last_reported()
+
+    reported = exported[a_latest][1] + 60
+    assert await _async_get_exported(hass, export_session) == {
+        **exported,
+        a_latest: (*exported[a_latest][:2], reported),
+    }
+    assert recorded_exporter.latest_states["sensor.a"] == (a_latest, reported)
+
+    # reports already copied aren't written again
+    with patch.object(
+        recorded_exporter,
+        "_update_last_reported",
+        wraps=recorded_exporter._update_last_reported,
+    ) as update_last_reported:
+        await recorded_exporter.async_reconcile_last_reported()
+    update_last_reported.assert_not_called()
+
+
+async def test_reconcile_only_updates_last_reported(
+    hass: HomeAssistant,
+    recorded_exporter: StateExporter,
+    export_session: ScopedSession,
+) -> None:
+    """Test reconciling leaves every other column of exported states alone."""
+    a_latest = (await _async_get_recorded(hass))["sensor.a"][-1]
+
+    def _tamper() -> None:
+        stmt = (
+            update(ExportedStates)
+            .filter(ExportedStates.state_id == a_latest)
+            .values(state_value="tampered")
+        )
+        try:
+            export_session.execute(stmt)
+            export_session.commit()
+        finally:
+            export_session.remove()
+
+    await hass.async_add_executor_job(_tamper)
+    exported = await _async_get_exported(hass, export_session)
+    await _async_report(hass, [a_latest], 30)
+    await recorded_exporter.async_reconcile_last_reported()
+
+    _, last_updated, _ = exported[a_latest]
+    assert (await _async_get_exported(hass, export_session))[a_latest] == (
+        "tampered",
+        last_updated,
+        last_updated + 30,
+    )
+
+
+async def test_latest_states_follow_exports(
+    hass: HomeAssistant,
+    recorded_exporter: StateExporter,
+    export_session: ScopedSession,
+) -> None:
+    """Test states exported later become the ones reconciled."""
+    hass.states.async_set("sensor.a", "3")
+    hass.states.async_set("sensor.c", "1")
+    await async_wait_recording_done(hass)
+    await recorded_exporter.async_export_all(ExportThrottle(hass))
+
+    recorded = await _async_get_recorded(hass)
+    exported = await _async_get_exported(hass, export_session)
+    latest = {
+        entity_id: (state_ids[-1], exported[state_ids[-1]][1])
+        for entity_id, state_ids in recorded.items()
+    }
+    assert recorded_exporter.latest_states == latest
+
+    a_latest, c_latest = recorded["sensor.a"][-1], recorded["sensor.c"][-1]
+    await _async_report(hass, [a_latest, c_latest], 10)
+    await recorded_exporter.async_reconcile_last_reported()
+    exported = await _async_get_exported(hass, export_session)
+    assert exported[a_latest][2] == exported[a_latest][1] + 10
+    assert exported[c_latest][2] == exported[c_latest][1] + 10
+
+    # a restarted exporter finds the same latest states in the target
+    restarted = StateExporter(export_session, hass, RecorderReader(hass), rollups=False)
+    assert (
+        await hass.async_add_executor_job(restarted._get_latest_states)
+        == recorded_exporter.latest_states
+    )
@@ -0,0 +1,207 @@
+"""Test the Database Exporter statistics exporters."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from sqlalchemy import select, update
+
+from homeassistant.components.database_exporter.db_schema import (
+    ExportedStatistics,
+    ExportedStatisticsMeta,
+    ExportedStatisticsShortTerm,
+)
+from homeassistant.components.database_exporter.exporters import (
+    ShortTermStatisticsExporter,
+    StatisticsExporter,
+)
+from homeassistant.components.database_exporter.reader import RecorderReader
+from homeassistant.components.database_exporter.types import ScopedSession
+from homeassistant.components.recorder import Recorder, get_instance
+from homeassistant.components.recorder.db_schema import (
+    Statistics,
+    StatisticsMeta,
+    StatisticsShortTerm,
+)
+from homeassistant.core import HomeAssistant
+
+# 2025-06-15 12:00:00 UTC
+START = 1_749_988_800.0
+PERIOD = 300
+STATISTIC_IDS = ("sensor.energy", "sensor.power")
+ROW_COUNT = 10
+
+EXPORTERS = [
+    (StatisticsExporter, Statistics, ExportedStatistics),
+    (ShortTermStatisticsExporter, StatisticsShortTerm, ExportedStatisticsShortTerm),
+]
+
+_META_COLUMNS = (
+    "statistic_id",
+    "source",
+    "unit_of_measurement",
+    "has_mean",
+    "mean_type",
+    "has_sum",
+    "name",
+)
+_VALUE_COLUMNS = (
+    "created_ts",
+    "start_ts",
+    "mean",
+    "min",
+    "max",
+    "last_reset_ts",
+    "state",
+    "sum",
+    "metadata_id",
+)
+
+
+async def _async_run_recorder(hass: HomeAssistant, run: Any) -> Any:
+    def _run() -> Any:
+        session = get_instance(hass).get_session()
+        try:
+            result = run(session)
+            session.commit()
+            return result
+        finally:
+            session.close()
+
+    return await get_instance(hass).async_add_executor_job(_run)
+
+
+async def _async_record(
+    hass: HomeAssistant, source_model: type[Statistics | StatisticsShortTerm]
+) -> None:
+    """Record statistics alternating between two metadata rows."""
+
+    def _record(session: Any) -> None:
+        metas = [
+            StatisticsMeta(
+                statistic_id=statistic_id,
+                source="recorder",
+                unit_of_measurement="kWh" if statistic_id.endswith("energy") else "W",
+                has_mean=statistic_id.endswith("power"),
+                mean_type=int(statistic_id.endswith("power")),
+                has_sum=statistic_id.endswith("energy"),
+                name=None,
+            )
+            for statistic_id in STATISTIC_IDS
+        ]
+        session.add_all(metas)
+        session.flush()
+        session.add_all(
+            source_model(
+                metadata_id=metas[i % 2].id,
+                created_ts=START + i * PERIOD + 10,
+                start_ts=START + i * PERIOD,
+                mean=i + 0.5 if i % 2 else None,
+                min=float(i) if i % 2 else None,
+                max=i + 1.0 if i % 2 else None,
+                last_reset_ts=None if i % 2 else START,
+                state=None if i % 2 else i * 1.5,
+                sum=None if i % 2 else i * 10.25,
+            )
+            for i in range(ROW_COUNT)
+        )
+
+    await _async_run_recorder(hass, _record)
+
+
+async def _async_get_recorded(
+    hass: HomeAssistant, source_model: type[Statistics | StatisticsShortTerm]
+) -> tuple[dict[int, tuple], dict[int, tuple]]:
+    def _get(session: Any) -> tuple[dict[int, tuple], dict[int, tuple]]:
+        metas = {
+            meta.id: tuple(getattr(meta, c) for c in _META_COLUMNS)
+            for meta in session.scalars(select(StatisticsMeta))
+        }
+        rows = {
+            row.id: tuple(getattr(row, c) for c in _VALUE_COLUMNS)
+            for row in session.scalars(select(source_model))
+        }
+        return metas, rows
+
+    return await _async_run_recorder(hass, _get)
+
+
+async def _async_get_exported(
+    hass: HomeAssistant,
+    session: ScopedSession,
+    exported_model: type[ExportedStatistics | ExportedStatisticsShortTerm],
+) -> tuple[dict[int, tuple], dict[int, tuple]]:
+    def _get() -> tuple[dict[int, tuple], dict[int, tuple]]:
+        try:
+            metas = {
+                meta.metadata_id: tuple(getattr(meta, c) for c in _META_COLUMNS)
+                for meta in session.scalars(select(ExportedStatisticsMeta))
+            }
+            rows = {
+                row.statistics_id: tuple(getattr(row, c) for c in _VALUE_COLUMNS)
+                for row in session.scalars(select(exported_model))
+            }
+            return metas, rows
+        finally:
+            session.remove()
+
+    return await hass.async_add_executor_job(_get)
+
+
+@pytest.mark.parametrize(
+    ("exporter_class", "source_model", "exported_model"),
+    EXPORTERS,
+    ids=["statistics", "statistics_short_term"],
+)
+async def test_export_round_trip(
+    hass: HomeAssistant,
+    recorder_mock: Recorder,
+    export_session: ScopedSession,
+    exporter_class: type[StatisticsExporter],
+    source_model: type[Statistics | StatisticsShortTerm],
+    exported_model: type[ExportedStatistics | ExportedStatisticsShortTerm],
+) -> None:
+    """Test statistics and their metadata are exported as recorded."""
+    await _async_record(hass, source_model)
+    recorded_metas, recorded_rows = await _async_get_recorded(hass, source_model)
+    assert len(recorded_rows) == ROW_COUNT
+
+    exporter = exporter_class(export_session, hass, RecorderReader(hass))
+    # small batches, so that both metadata rows are exported in every batch
+    batches = []
+    while count := await exporter.async_export_batch(limit=3):
+        batches.append(count)
+    assert batches == [3, 3, 3, 1]
+
+    exported_metas, exported_rows = await _async_get_exported(
+        hass, export_session, exported_model
+    )
+    assert exported_metas == recorded_metas
+    assert exported_rows == recorded_rows
+
+
+async def test_export_meta_updates(
+    hass: HomeAssistant, recorder_mock: Recorder, export_session: ScopedSession
+) -> None:
+    """Test metadata shared by later batches is updated, not duplicated."""
+    await _async_record(hass, Statistics)
+    exporter = StatisticsExporter(export_session, hass, RecorderReader(hass))
+    assert await exporter.async_export_batch(limit=4) == 4
+
+    await _async_run_recorder(
+        hass,
+        lambda session: session.execute(
+            update(StatisticsMeta)
+            .filter(StatisticsMeta.statistic_id == STATISTIC_IDS[0])
+            .values(name="Energy", unit_of_measurement="Wh")
+        ),
+    )
+    assert await exporter.async_export_batch(limit=4) == 4
+
+    recorded_metas, _ = await _async_get_recorded(hass, Statistics)
+    exported_metas, _ = await _async_get_exported(
+        hass, export_session, ExportedStatistics
+    )
+    assert exported_metas == recorded_metas
+    assert any(meta[-1] == "Energy" for meta in exported_metas.values())
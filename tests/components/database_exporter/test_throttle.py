@@ -0,0 +1,114 @@
+"""Test the Database Exporter export throttle."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Generator
+from dataclasses import dataclass, field
+from unittest.mock import Mock, patch
+
+import pytest
+
+from homeassistant.components.database_exporter import throttle
+from homeassistant.components.database_exporter.throttle import (
+    BUSY_BACKLOG,
+    MAX_BACKOFF,
+    MAX_BUSY_WAIT,
+    MIN_BACKOFF,
+    ExportThrottle,
+)
+
+
+@dataclass
+class FakeClock:
+    """A monotonic clock that only advances when the throttle sleeps."""
+
+    now: float = 1000.0
+    sleeps: list[float] = field(default_factory=list)
+    on_sleep: Callable[[], None] | None = None
+
+    def monotonic(self) -> float:
+        """Return the current time."""
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        """Advance the clock instead of sleeping."""
+        self.sleeps.append(delay)
+        self.now += delay
+        if self.on_sleep is not None:
+            self.on_sleep()
+
+
+@pytest.fixture
+def recorder() -> Mock:
+    """Return an idle recorder."""
+    return Mock(backlog=0)
+
+
+@pytest.fixture
+def clock(recorder: Mock) -> Generator[FakeClock]:
+    """Return the clock the throttle waits on."""
+    clock = FakeClock()
+    with (
+        patch.object(throttle, "time", Mock(monotonic=clock.monotonic)),
+        patch.object(throttle, "asyncio", Mock(sleep=clock.sleep)),
+        patch.object(throttle, "get_recorder_instance", return_value=recorder),
+    ):
+        yield clock
+
+
+async def test_idle_only_yields(clock: FakeClock) -> None:
+    """Test an idle recorder without a ceiling only yields to the event loop."""
+    export_throttle = ExportThrottle(Mock())
+    for _ in range(3):
+        await export_throttle.async_wait(10_000)
+
+    assert clock.sleeps == [0, 0, 0]
+    assert clock.now == 1000.0
+
+
+async def test_rate_ceiling(clock: FakeClock) -> None:
+    """Test batches are paced to stay under the rows per second ceiling."""
+    export_throttle = ExportThrottle(Mock(), max_rows_per_second=100)
+    await export_throttle.async_wait(50)
+    await export_throttle.async_wait(200)
+    assert clock.sleeps == [0.5, 2.0]
+
+    # a slow batch doesn't build up credit for a burst afterwards
+    clock.now += 10
+    await export_throttle.async_wait(50)
+    assert clock.sleeps == [0.5, 2.0, 0.5]
+
+
+async def test_busy_backoff(clock: FakeClock, recorder: Mock) -> None:
+    """Test the export backs off while the recorder has a backlog."""
+    recorder.backlog = BUSY_BACKLOG + 1
+
+    def _drain() -> None:
+        if len(clock.sleeps) == 5:
+            recorder.backlog = BUSY_BACKLOG
+
+    clock.on_sleep = _drain
+    await ExportThrottle(Mock()).async_wait(100)
+
+    assert clock.sleeps == [
+        0,
+        MIN_BACKOFF,
+        MIN_BACKOFF * 2,
+        MIN_BACKOFF * 4,
+        MIN_BACKOFF * 8,
+    ]
+
+
+async def test_busy_wait_capped(clock: FakeClock, recorder: Mock) -> None:
+    """Test a recorder that stays busy only holds up a batch so long."""
+    recorder.backlog = BUSY_BACKLOG + 1
+    await ExportThrottle(Mock()).async_wait(100)
+
+    backoffs = clock.sleeps[1:]
+    assert max(backoffs) == MAX_BACKOFF
+    assert sum(backoffs[:-1]) < MAX_BUSY_WAIT <= sum(backoffs)
+
+    # every batch gets its own budget
+    clock.sleeps.clear()
+    await ExportThrottle(Mock()).async_wait(100)
+    assert clock.sleeps[1:] == backoffs
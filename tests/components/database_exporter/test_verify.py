@@ -0,0 +1,232 @@
+"""Test the Database Exporter export verification."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator, Callable
+from pathlib import Path
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import delete, select, update
+
+from homeassistant.components.database_exporter import verify
+from homeassistant.components.database_exporter.const import (
+    ATTR_TIME_BUDGET,
+    CONF_DB_URL,
+    DOMAIN,
+    SERVICE_VERIFY,
+)
+from homeassistant.components.database_exporter.core import DatabaseExportManager
+from homeassistant.components.database_exporter.db_schema import (
+    TABLE_EXPORTED_STATES,
+    ExportedStates,
+)
+from homeassistant.components.database_exporter.reader import RecorderReader
+from homeassistant.components.database_exporter.verify import VerifyResult
+from homeassistant.components.recorder import Recorder, get_instance
+from homeassistant.components.recorder.db_schema import States
+from homeassistant.core import HomeAssistant
+
+from tests.common import MockConfigEntry
+from tests.components.recorder.common import async_wait_recording_done
+
+STATE_COUNT = 250
+
+
+@pytest.fixture
+async def manager(
+    hass: HomeAssistant, recorder_mock: Recorder, tmp_path: Path
+) -> AsyncGenerator[DatabaseExportManager]:
+    """Return an export manager whose target holds every recorded state."""
+    for i in range(STATE_COUNT):
+        hass.states.async_set(f"sensor.power_{i % 5}", str(i))
+    await async_wait_recording_done(hass)
+
+    manager = DatabaseExportManager(
+        hass, RecorderReader(hass), f"sqlite:///{tmp_path / 'export.db'}"
+    )
+    await manager.async_setup()
+    await manager.async_export_data()
+    # small ranges, so that a few hundred states span several of them
+    with (
+        patch.object(verify, "RANGE_SIZE", 100),
+        patch.object(verify, "LEAF_SIZE", 10),
+    ):
+        yield manager
+    await manager.async_teardown()
+
+
+async def _async_run_target(
+    hass: HomeAssistant, manager: DatabaseExportManager, stmt: Any
+) -> list[Any]:
+    def _run() -> list[Any]:
+        session = manager.session
+        try:
+            result = session.execute(stmt)
+            rows = list(result.all()) if result.returns_rows else []
+            session.commit()
+            return rows
+        finally:
+            session.remove()
+
+    return await hass.async_add_executor_job(_run)
+
+
+async def _async_run_recorder(hass: HomeAssistant, stmt: Any) -> None:
+    def _run() -> None:
+        session = get_instance(hass).get_session()
+        try:
+            session.execute(stmt)
+            session.commit()
+        finally:
+            session.close()
+
+    await get_instance(hass).async_add_executor_job(_run)
+
+
+async def _async_verify_states(
+    manager: DatabaseExportManager, time_budget: float = 60
+) -> VerifyResult:
+    results = await manager.async_verify_data(time_budget)
+    return results[TABLE_EXPORTED_STATES]
+
+
+async def _async_get_exported(
+    hass: HomeAssistant, manager: DatabaseExportManager
+) -> dict[int, float]:
+    stmt = select(ExportedStates.state_id, ExportedStates.last_updated)
+    rows = await _async_run_target(hass, manager, stmt)
+    return dict(rows)
+
+
+async def test_verify_up_to_date(
+    hass: HomeAssistant, manager: DatabaseExportManager
+) -> None:
+    """Test a complete target is checked without repairing anything."""
+    with patch.object(
+        verify.RangeVerifier, "_async_repair_range", autospec=True
+    ) as repair:
+        result = await _async_verify_states(manager)
+
+    assert result == VerifyResult(ranges_checked=3, complete=True)
+    repair.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "tamper",
+    [
+        lambda state_id: delete(ExportedStates).filter(
+            ExportedStates.state_id == state_id
+        ),
+        # a sub-second difference is still caught
+        lambda state_id: (
+            update(ExportedStates)
+            .filter(ExportedStates.state_id == state_id)
+            .values(last_updated=ExportedStates.last_updated + 0.25)
+        ),
+    ],
+    ids=["missing", "mismatched"],
+)
+async def test_verify_repairs(
+    hass: HomeAssistant,
+    manager: DatabaseExportManager,
+    tamper: Callable[[int], Any],
+) -> None:
+    """Test missing and mismatched rows are exported again."""
+    exported = await _async_get_exported(hass, manager)
+    state_id = sorted(exported)[STATE_COUNT // 2]
+    await _async_run_target(hass, manager, tamper(state_id))
+
+    result = await _async_verify_states(manager)
+    assert result == VerifyResult(ranges_checked=3, rows_repaired=1, complete=True)
+    assert await _async_get_exported(hass, manager) == exported
+
+    # nothing is left to repair
+    result = await _async_verify_states(manager)
+    assert result.rows_repaired == 0
+
+
+async def test_verify_purged_rows(
+    hass: HomeAssistant, manager: DatabaseExportManager
+) -> None:
+    """Test rows purged from the recorder are reported once, then ignored."""
+    exported = await _async_get_exported(hass, manager)
+    purged = sorted(exported)[100:150]
+    await _async_run_recorder(
+        hass,
+        update(States)
+        .filter(States.old_state_id.in_(purged))
+        .values(old_state_id=None),
+    )
+    await _async_run_recorder(hass, delete(States).filter(States.state_id.in_(purged)))
+
+    result = await _async_verify_states(manager)
+    assert result == VerifyResult(
+        ranges_checked=3, rows_target_only=len(purged), complete=True
+    )
+
+    # the purged leaves now match without being compared row by row
+    with patch.object(
+        verify.RangeVerifier, "_async_repair_range", autospec=True
+    ) as repair:
+        result = await _async_verify_states(manager)
+    assert result == VerifyResult(ranges_checked=3, complete=True)
+    repair.assert_not_called()
+    assert await _async_get_exported(hass, manager) == exported
+
+
+async def test_verify_resumes(
+    hass: HomeAssistant, manager: DatabaseExportManager
+) -> None:
+    """Test verification picks up where the previous slice stopped."""
+    exported = await _async_get_exported(hass, manager)
+    # the latest row is kept, so the deleted one is still below the watermark
+    state_id = max(exported) - 1
+    await _async_run_target(
+        hass,
+        manager,
+        delete(ExportedStates).filter(ExportedStates.state_id == state_id),
+    )
+
+    # a spent time budget still checks a single range per slice
+    results = [await _async_verify_states(manager, 0) for _ in range(3)]
+    assert results == [
+        VerifyResult(ranges_checked=1),
+        VerifyResult(ranges_checked=1),
+        VerifyResult(ranges_checked=1, rows_repaired=1, complete=True),
+    ]
+
+    # a completed verification starts over
+    result = await _async_verify_states(manager, 0)
+    assert result == VerifyResult(ranges_checked=1)
+
+
+async def test_verify_service(
+    hass: HomeAssistant, recorder_mock: Recorder, tmp_path: Path
+) -> None:
+    """Test the verify service reports a result per entry and table."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_DB_URL: f"sqlite:///{tmp_path / 'export.db'}"},
+        minor_version=2,
+    )
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_VERIFY,
+        {ATTR_TIME_BUDGET: 1},
+        blocking=True,
+        return_response=True,
+    )
+
+    results = response["entries"][entry.entry_id]
+    assert results[TABLE_EXPORTED_STATES] == {
+        "ranges_checked": 0,
+        "rows_repaired": 0,
+        "rows_target_only": 0,
+        "complete": True,
+    }